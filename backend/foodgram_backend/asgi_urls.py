@@ -0,0 +1,26 @@
+"""
+URL-конфигурация режима ASGI (SERVER_MODE=asgi).
+I/O-действия вьюсетов заменены асинхронными обработчиками
+с теми же адресами, остальное совпадает с foodgram_backend.urls.
+"""
+from django.urls import path
+
+from recipes import async_views as recipe_views
+from users import async_views as user_views
+from .urls import urlpatterns as sync_urlpatterns
+
+urlpatterns = [
+    path(
+        'api/recipes/download_shopping_cart/',
+        recipe_views.download_shopping_cart
+    ),
+    path('api/recipes/<int:pk>/get-link/', recipe_views.get_short_link),
+    path('api/users/me/avatar/', user_views.avatar),
+    path(
+        's/<str:code>/', recipe_views.short_link_redirect, name='short-link'
+    ),
+    *(
+        pattern for pattern in sync_urlpatterns
+        if getattr(pattern, 'name', None) != 'short-link'
+    ),
+]
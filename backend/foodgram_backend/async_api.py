@@ -0,0 +1,82 @@
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+from django.http import Http404, HttpResponseNotAllowed, JsonResponse
+from rest_framework import exceptions
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+
+def in_pool(func):
+    """
+    Выполнить блокирующую функцию в пуле потоков, а не в общем
+    потоке синхронных views: пока она ждёт базу или диск, воркер
+    обслуживает другие запросы. У каждого потока пула своё
+    соединение с базой, устаревшие закрываются как в конце запроса.
+    """
+    def run(*args, **kwargs):
+        close_old_connections()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            close_old_connections()
+
+    return sync_to_async(run, thread_sensitive=False)
+
+
+def prepare_request(request):
+    """Аутентификация и разбор тела запроса как во вьюсетах DRF."""
+    request = Request(
+        request,
+        parsers=[parser() for parser in api_settings.DEFAULT_PARSER_CLASSES],
+        authenticators=[
+            auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES
+        ],
+    )
+    request.user
+    if request.method not in ('GET', 'HEAD'):
+        request.data
+    return request
+
+
+def error_response(error):
+    if isinstance(error, Http404):
+        error = exceptions.NotFound()
+    detail = error.detail
+    if not isinstance(detail, (dict, list)):
+        detail = {'detail': detail}
+    response = JsonResponse(detail, status=error.status_code, safe=False)
+    if isinstance(
+        error, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)
+    ):
+        response['WWW-Authenticate'] = 'Token'
+    return response
+
+
+def async_api_view(*methods, login_required=True):
+    """
+    Асинхронный обработчик API для режима ASGI.
+    DRF 3.12 вызывает только синхронные обработчики, а Django 3.2
+    выполняет их все в одном потоке воркера. Такой обработчик
+    вызывается самим Django, блокирующие шаги он ожидает через
+    in_pool. Аутентификация, разбор тела и ответы об ошибках
+    совпадают с вьюсетами DRF.
+    """
+    def decorator(handler):
+        @wraps(handler)
+        async def view(request, *args, **kwargs):
+            if request.method not in methods:
+                return HttpResponseNotAllowed(methods)
+            try:
+                request = await in_pool(prepare_request)(request)
+                if login_required and not request.user.is_authenticated:
+                    raise exceptions.NotAuthenticated()
+                return await handler(request, *args, **kwargs)
+            except (exceptions.APIException, Http404) as error:
+                return error_response(error)
+
+        # Аутентификация по токену, как у вьюсетов DRF.
+        view.csrf_exempt = True
+        return view
+    return decorator
@@ -0,0 +1,44 @@
+"""
+Настройки сервера для benchmark_concurrency без PostgreSQL:
+SQLite и задержка DB_LATENCY_MS на каждый запрос к базе,
+как сетевой round trip до отдельного сервера базы.
+DJANGO_SETTINGS_MODULE=foodgram_backend.benchmark_settings \
+SERVER_MODE=asgi gunicorn -c gunicorn.conf.py
+"""
+import os
+import tempfile
+import time
+
+from django.db.backends.signals import connection_created
+
+from .settings import *  # noqa: F401,F403
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.getenv('BENCHMARK_DB', os.path.join(
+            tempfile.gettempdir(), 'foodgram_benchmark.sqlite3'
+        )),
+        'OPTIONS': {'timeout': 30},
+    },
+}
+
+MEDIA_ROOT = os.getenv('BENCHMARK_MEDIA_ROOT', os.path.join(
+    tempfile.gettempdir(), 'foodgram_benchmark_media'
+))
+
+DB_LATENCY_MS = int(os.getenv('DB_LATENCY_MS', 5))
+
+
+def delay_query(execute, sql, params, many, context):
+    time.sleep(DB_LATENCY_MS / 1000)
+    return execute(sql, params, many, context)
+
+
+def add_latency(sender, connection, **kwargs):
+    # Обёртка соединения переживает переподключения.
+    if delay_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(delay_query)
+
+
+connection_created.connect(add_latency)
@@ -0,0 +1,41 @@
+from time import monotonic
+
+from django.conf import settings
+from django.db import connections
+from django.utils.deprecation import MiddlewareMixin
+
+
+def check_connections():
+    """
+    Закрыть постоянные соединения, которые перестали отвечать
+    (перезапуск базы или PgBouncer, сетевой разрыв),
+    чтобы запрос открыл новое вместо ошибки на первом SQL.
+    Каждое соединение проверяется не чаще раза
+    в CONN_HEALTH_CHECK_INTERVAL секунд: проверка — это отдельный
+    запрос к базе, и делать его на каждый HTTP-запрос дорого.
+    """
+    now = monotonic()
+    for connection in connections.all():
+        if (
+            connection.connection is None
+            or connection.settings_dict['CONN_MAX_AGE'] == 0
+            or connection.in_atomic_block
+        ):
+            continue
+        checked_at = getattr(connection, 'health_checked_at', None)
+        if (
+            checked_at is not None
+            and now - checked_at < settings.CONN_HEALTH_CHECK_INTERVAL
+        ):
+            continue
+        connection.health_checked_at = now
+        if not connection.is_usable():
+            connection.close()
+
+
+class ConnectionHealthCheckMiddleware(MiddlewareMixin):
+    """Проверка постоянных соединений в начале запроса."""
+
+    def process_request(self, request):
+        if settings.CONN_HEALTH_CHECKS:
+            check_connections()
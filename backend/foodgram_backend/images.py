@@ -0,0 +1,151 @@
+import base64
+import binascii
+import io
+from pathlib import Path
+from tempfile import SpooledTemporaryFile
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.base import ContentFile
+from django.db import models
+from PIL import Image, ImageOps, UnidentifiedImageError, features
+
+# Кратно 4, чтобы части base64 декодировались независимо.
+BASE64_CHUNK_SIZE = 64 * 1024
+
+
+class ImageStatus(models.TextChoices):
+    PROCESSING = 'processing', 'Обрабатывается'
+    READY = 'ready', 'Готово'
+    FAILED = 'failed', 'Ошибка'
+
+
+class ImageDecodeError(ValueError):
+    pass
+
+
+class ImageTooLargeError(ImageDecodeError):
+    pass
+
+
+def decoded_size(encoded):
+    """Размер данных после декодирования base64 без самого декодирования."""
+    return len(encoded) * 3 // 4 - encoded[-2:].count('=')
+
+
+def decode_base64(encoded, name, max_size=None):
+    """
+    Декодировать base64 частями во временный файл.
+    Размер проверяется до декодирования,
+    в памяти одновременно находится только одна часть.
+    """
+    max_size = max_size or settings.IMAGE_MAX_UPLOAD_SIZE
+    if decoded_size(encoded) > max_size:
+        raise ImageTooLargeError(max_size)
+    output = SpooledTemporaryFile(
+        max_size=settings.FILE_UPLOAD_MAX_MEMORY_SIZE
+    )
+    try:
+        for start in range(0, len(encoded), BASE64_CHUNK_SIZE):
+            output.write(base64.b64decode(
+                encoded[start:start + BASE64_CHUNK_SIZE], validate=True
+            ))
+    except binascii.Error as error:
+        output.close()
+        raise ImageDecodeError(str(error))
+    output.seek(0)
+    return File(output, name=name)
+
+
+def output_format():
+    """WebP, если Pillow собран с его поддержкой, иначе JPEG."""
+    if settings.IMAGE_FORMAT == 'WEBP' and features.check('webp'):
+        return 'WEBP', 'webp'
+    return 'JPEG', 'jpg'
+
+
+def encode(image, name):
+    image_format, extension = output_format()
+    if image_format == 'JPEG' or image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGB' if image_format == 'JPEG' else 'RGBA')
+    buffer = io.BytesIO()
+    image.save(buffer, image_format, quality=settings.IMAGE_QUALITY)
+    return ContentFile(
+        buffer.getvalue(), name=f'{Path(name).stem}.{extension}'
+    )
+
+
+def open_image(file):
+    file.seek(0)
+    image = Image.open(file)
+    return ImageOps.exif_transpose(image)
+
+
+def normalize_image(file):
+    """Повернуть по EXIF, уменьшить до IMAGE_MAX_SIDE и перекодировать."""
+    image = open_image(file)
+    image.thumbnail((settings.IMAGE_MAX_SIDE, settings.IMAGE_MAX_SIDE))
+    return encode(image, file.name)
+
+
+def make_thumbnail(file, size):
+    """Миниатюра фиксированного размера с обрезкой по центру."""
+    image = ImageOps.fit(open_image(file), size)
+    return encode(image, f'{Path(file.name).stem}_{size[0]}x{size[1]}')
+
+
+def check_image_header(file):
+    """
+    Проверить по заголовку, что файл является изображением,
+    не декодируя его целиком. Возвращает расширение по формату.
+    """
+    try:
+        with Image.open(file) as image:
+            image_format = image.format
+    except (UnidentifiedImageError, OSError):
+        raise ImageDecodeError('not an image')
+    file.seek(0)
+    return image_format.lower()
+
+
+def render_variants(data, name, size):
+    """
+    Построить нормализованное изображение и миниатюру из исходных байтов.
+    Чистая функция для запуска в пуле процессов.
+    """
+    source = File(io.BytesIO(data), name=name)
+    image = normalize_image(source)
+    thumbnail = make_thumbnail(source, size)
+    return (image.name, image.read()), (thumbnail.name, thumbnail.read())
+
+
+def prepare_image(instance, source, target, status, size):
+    """
+    Перед сохранением модели обработать только что загруженное
+    изображение source: сразу создать миниатюру target
+    или, при IMAGE_PROCESSING_ASYNC, отметить его для фоновой обработки.
+    """
+    image = getattr(instance, source)
+    if not image:
+        setattr(instance, target, None)
+        setattr(instance, status, ImageStatus.READY)
+        return
+    if image._committed:
+        return
+    if settings.IMAGE_PROCESSING_ASYNC:
+        setattr(instance, status, ImageStatus.PROCESSING)
+        instance._pending_images = getattr(
+            instance, '_pending_images', set()
+        ) | {source}
+        return
+    setattr(instance, target, make_thumbnail(image.file, size))
+    setattr(instance, status, ImageStatus.READY)
+
+
+def pop_pending_image(instance, source):
+    """Снять с экземпляра отметку о необходимости фоновой обработки."""
+    pending = getattr(instance, '_pending_images', set())
+    if source not in pending:
+        return False
+    pending.discard(source)
+    return True
@@ -0,0 +1,298 @@
+import asyncio
+import logging
+import time
+from bisect import bisect_left
+from collections import Counter
+from contextvars import ContextVar
+from threading import Lock
+
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+
+logger = logging.getLogger('foodgram.sql')
+
+DURATION_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200)
+SIZE_BUCKETS = (
+    256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304
+)
+
+
+class Histogram:
+    """Гистограмма в формате Prometheus с разбивкой по меткам."""
+
+    def __init__(self, name, help, buckets):
+        self.name = name
+        self.help = help
+        self.buckets = buckets
+        self._lock = Lock()
+        self._series = {}
+
+    def observe(self, labels, value):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = {
+                    'counts': [0] * (len(self.buckets) + 1),
+                    'sum': 0,
+                }
+            series['counts'][bisect_left(self.buckets, value)] += 1
+            series['sum'] += value
+
+    def render(self):
+        lines = [
+            f'# HELP {self.name} {self.help}',
+            f'# TYPE {self.name} histogram',
+        ]
+        with self._lock:
+            series = sorted(self._series.items())
+            for labels, values in series:
+                label = ','.join(f'{key}="{value}"' for key, value in labels)
+                total = 0
+                for bound, count in zip(
+                    (*self.buckets, '+Inf'), values['counts']
+                ):
+                    total += count
+                    lines.append(
+                        f'{self.name}_bucket{{{label},le="{bound}"}} {total}'
+                    )
+                lines.append(f'{self.name}_sum{{{label}}} {values["sum"]}')
+                lines.append(f'{self.name}_count{{{label}}} {total}')
+        return lines
+
+
+class MetricCounter:
+    """Монотонный счётчик в формате Prometheus с разбивкой по меткам."""
+
+    def __init__(self, name, help):
+        self.name = name
+        self.help = help
+        self._lock = Lock()
+        self._values = Counter()
+
+    def inc(self, labels=(), value=1):
+        with self._lock:
+            self._values[labels] += value
+
+    def value(self, labels=()):
+        return self._values[labels]
+
+    def render(self):
+        lines = [
+            f'# HELP {self.name} {self.help}',
+            f'# TYPE {self.name} counter',
+        ]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                label = ','.join(f'{key}="{item}"' for key, item in labels)
+                lines.append(
+                    f'{self.name}{{{label}}} {value}' if label
+                    else f'{self.name} {value}'
+                )
+        return lines
+
+
+REQUEST_DURATION = Histogram(
+    'foodgram_request_duration_seconds',
+    'Время обработки запроса.', DURATION_BUCKETS
+)
+DB_DURATION = Histogram(
+    'foodgram_db_duration_seconds',
+    'Суммарное время SQL-запросов за запрос.', DURATION_BUCKETS
+)
+SERIALIZE_DURATION = Histogram(
+    'foodgram_serialize_duration_seconds',
+    'Время view без SQL и рендеринг ответа.', DURATION_BUCKETS
+)
+DB_QUERIES = Histogram(
+    'foodgram_db_queries',
+    'Количество SQL-запросов за запрос.', QUERY_BUCKETS
+)
+RESPONSE_SIZE = Histogram(
+    'foodgram_response_size_bytes',
+    'Размер тела ответа.', SIZE_BUCKETS
+)
+REGISTRY = [
+    REQUEST_DURATION, DB_DURATION, SERIALIZE_DURATION, DB_QUERIES,
+    RESPONSE_SIZE
+]
+
+
+def register(metric):
+    """Добавить метрику в вывод /api/metrics/."""
+    REGISTRY.append(metric)
+    return metric
+
+
+current_recorder = ContextVar('current_recorder', default=None)
+
+
+class QueryRecorder:
+    """Счётчик SQL-запросов и их времени в рамках одного HTTP-запроса."""
+
+    def __init__(self, collect_sql=False):
+        self.collect_sql = collect_sql
+        self.count = 0
+        self.duration = 0
+        self.statements = Counter()
+        self.slow = []
+
+    def add(self, sql, duration):
+        self.count += 1
+        self.duration += duration
+        if self.collect_sql:
+            self.statements[sql] += 1
+            if duration * 1000 >= settings.SLOW_QUERY_MS:
+                self.slow.append((duration, sql))
+
+
+def record_query(execute, sql, params, many, context):
+    """
+    Обёртка выполнения SQL на каждом соединении.
+    Счётчик запроса берётся из контекстной переменной: она переходит
+    вместе с запросом в поток синхронных views и под ASGI,
+    поэтому одновременные запросы не смешиваются.
+    """
+    recorder = current_recorder.get()
+    if recorder is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        recorder.add(sql, time.perf_counter() - start)
+
+
+def install_query_recorder(connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+connection_created.connect(install_query_recorder)
+
+
+class MetricsMiddleware:
+    """
+    Метрики запроса: число SQL-запросов, время в базе,
+    время сериализации и размер ответа.
+    В DRF сериализация выполняется внутри view (serializer.data)
+    и при рендеринге, поэтому её время — время view без SQL
+    плюс рендеринг. Значения отдаются заголовком Server-Timing
+    и накапливаются в гистограммах для /api/metrics/.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+        for connection in connections.all():
+            install_query_recorder(connection)
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        recorder, token = self.start(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_recorder.reset(token)
+        self.record(request, response, recorder)
+        return response
+
+    async def __acall__(self, request):
+        recorder, token = self.start(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_recorder.reset(token)
+        self.record(request, response, recorder)
+        return response
+
+    def start(self, request):
+        recorder = QueryRecorder(collect_sql=settings.SLOW_QUERY_LOG)
+        request._metrics = {'start': time.perf_counter()}
+        return recorder, current_recorder.set(recorder)
+
+    def process_template_response(self, request, response):
+        """DRF-ответ рендерится после view: засечь начало рендеринга."""
+        request._metrics['view_end'] = time.perf_counter()
+        return response
+
+    def record(self, request, response, recorder):
+        end = time.perf_counter()
+        total = end - request._metrics['start']
+        view_end = request._metrics.get('view_end', end)
+        serialize = max(
+            0, view_end - request._metrics['start'] - recorder.duration
+        ) + (end - view_end)
+        labels = (
+            ('view', self.view_name(request)),
+            ('method', request.method),
+            ('status', response.status_code),
+        )
+        REQUEST_DURATION.observe(labels, total)
+        DB_DURATION.observe(labels, recorder.duration)
+        SERIALIZE_DURATION.observe(labels, serialize)
+        DB_QUERIES.observe(labels, recorder.count)
+        if not response.streaming:
+            RESPONSE_SIZE.observe(labels, len(response.content))
+        response['Server-Timing'] = ', '.join((
+            f'db;dur={recorder.duration * 1000:.1f};'
+            f'desc="{recorder.count} queries"',
+            f'serialize;dur={serialize * 1000:.1f}',
+            f'total;dur={total * 1000:.1f}',
+        ))
+        if recorder.collect_sql:
+            self.log_queries(request, recorder)
+
+    def view_name(self, request):
+        match = request.resolver_match
+        if match is None:
+            return 'unresolved'
+        return match.view_name or match.route
+
+    def log_queries(self, request, recorder):
+        """Записать повторяющиеся (N+1) и медленные запросы."""
+        for sql, count in recorder.statements.most_common():
+            if count < settings.DUPLICATE_QUERY_THRESHOLD:
+                break
+            logger.warning(
+                '%s %s: запрос выполнен %d раз: %s',
+                request.method, request.path, count, sql
+            )
+        for duration, sql in recorder.slow:
+            logger.warning(
+                '%s %s: медленный запрос %.1f мс: %s',
+                request.method, request.path, duration * 1000, sql
+            )
+
+
+def metrics(request):
+    """
+    Метрики процесса в текстовом формате Prometheus.
+    Доступны с заголовком Authorization: Bearer METRICS_TOKEN
+    или администратору, вошедшему через админку.
+    Без METRICS_TOKEN в настройках остаётся только второй вариант.
+    """
+    token = settings.METRICS_TOKEN
+    header = request.headers.get('Authorization', '')
+    if not (
+        token and constant_time_compare(header, f'Bearer {token}')
+        or request.user.is_staff
+    ):
+        return HttpResponseForbidden()
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return HttpResponse(
+        '\n'.join(lines) + '\n',
+        content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
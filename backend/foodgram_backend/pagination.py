@@ -1,5 +1,137 @@
-from rest_framework.pagination import PageNumberPagination
+from base64 import b64decode, b64encode
+from collections import namedtuple
+from urllib import parse
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+from rest_framework.utils.urls import replace_query_param
+
+KeysetCursor = namedtuple('KeysetCursor', ('value', 'id', 'reverse'))
 
 
 class CustomPagination(PageNumberPagination):
     page_size_query_param = 'limit'
+
+
+class RecipeCursorPagination(CursorPagination):
+    """
+    Курсорная пагинация рецептов без OFFSET и COUNT(*).
+    Порядок задаётся параметром ordering,
+    каждому варианту соответствует составной индекс.
+    Курсор хранит пару (значение поля, id) крайней строки,
+    и следующая страница выбирается условием по этой паре:
+    одинаковые значения поля не приводят к повторам и пропускам.
+    """
+
+    page_size_query_param = 'limit'
+    ordering_param = 'ordering'
+    orderings = {
+        '-created': ('-created', '-id'),
+        '-favorites': ('-favorites_count', '-id'),
+        'cooking_time': ('cooking_time', 'id'),
+    }
+    default_ordering = '-created'
+
+    def get_ordering(self, request, queryset, view):
+        ordering = request.query_params.get(
+            self.ordering_param, self.default_ordering
+        )
+        if ordering not in self.orderings:
+            raise ValidationError({
+                self.ordering_param: (
+                    f'Допустимые значения: {", ".join(self.orderings)}.'
+                )
+            })
+        return self.orderings[ordering]
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.field = self.ordering[0].lstrip('-')
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is not None:
+            try:
+                self.cursor = self.cursor._replace(
+                    value=queryset.model._meta.get_field(
+                        self.field
+                    ).to_python(self.cursor.value)
+                )
+            except DjangoValidationError:
+                raise NotFound(self.invalid_cursor_message)
+        reverse = self.cursor is not None and self.cursor.reverse
+        page = self.get_page(queryset, reverse)
+        has_more = len(page) > self.page_size
+        self.page = page[:self.page_size]
+        if reverse:
+            self.page.reverse()
+            self.has_previous, self.has_next = has_more, True
+        else:
+            self.has_previous = self.cursor is not None
+            self.has_next = has_more
+        return self.page
+
+    def get_page(self, queryset, reverse):
+        """Строки после курсора, на одну больше размера страницы."""
+        descending = self.ordering[0].startswith('-') != reverse
+        prefix = '-' if descending else ''
+        queryset = queryset.order_by(f'{prefix}{self.field}', f'{prefix}id')
+        if self.cursor is not None:
+            lookup = 'lt' if descending else 'gt'
+            queryset = queryset.filter(
+                Q(**{f'{self.field}__{lookup}': self.cursor.value})
+                | Q(**{self.field: self.cursor.value,
+                       f'id__{lookup}': self.cursor.id})
+            )
+        return list(queryset[:self.page_size + 1])
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        if self.page:
+            return self.encode_cursor(self.position(self.page[-1], False))
+        return self.encode_cursor(self.cursor._replace(reverse=False))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if self.page:
+            return self.encode_cursor(self.position(self.page[0], True))
+        return self.encode_cursor(self.cursor._replace(reverse=True))
+
+    def position(self, instance, reverse):
+        value = getattr(instance, self.field)
+        if hasattr(value, 'isoformat'):
+            value = value.isoformat()
+        return KeysetCursor(str(value), instance.id, reverse)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            tokens = parse.parse_qs(
+                b64decode(encoded.encode('ascii')).decode('ascii'),
+                keep_blank_values=True
+            )
+            return KeysetCursor(
+                tokens['v'][0], int(tokens['i'][0]),
+                bool(int(tokens.get('r', ['0'])[0]))
+            )
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, cursor):
+        tokens = {'v': cursor.value, 'i': cursor.id}
+        if cursor.reverse:
+            tokens['r'] = '1'
+        encoded = b64encode(
+            parse.urlencode(tokens).encode('ascii')
+        ).decode('ascii')
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, encoded
+        )
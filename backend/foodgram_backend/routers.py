@@ -0,0 +1,88 @@
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.utils.deprecation import MiddlewareMixin
+from rest_framework.permissions import SAFE_METHODS
+
+REPLICA = 'replica'
+PIN_COOKIE = 'read_primary'
+PIN_HEADER = 'X-Read-Primary'
+
+replica_reads = ContextVar('replica_reads', default=False)
+
+
+class ReplicaRouter:
+    """
+    Чтение в запросах, разрешённых ReplicaReadMixin, идёт в реплику,
+    всё остальное — запись, фоновые задачи, команды — в основную базу.
+    Без настроенной реплики все запросы идут в default.
+    """
+
+    def db_for_read(self, model, **hints):
+        if replica_reads.get() and REPLICA in settings.DATABASES:
+            return REPLICA
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
+
+
+class ReplicaRoutingMiddleware(MiddlewareMixin):
+    """
+    Чтение собственных изменений: после успешного небезопасного запроса
+    клиент получает cookie, и пока она жива, его чтения идут
+    в основную базу, а не в отстающую реплику.
+    Тот же эффект даёт заголовок X-Read-Primary.
+    """
+
+    def process_request(self, request):
+        replica_reads.set(False)
+        request.read_primary = (
+            PIN_COOKIE in request.COOKIES
+            or bool(request.headers.get(PIN_HEADER))
+        )
+
+    def process_response(self, request, response):
+        replica_reads.set(False)
+        if (
+            request.method not in SAFE_METHODS
+            and response.status_code < 400
+            and settings.REPLICA_PIN_SECONDS
+        ):
+            response.set_cookie(
+                PIN_COOKIE, '1', max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True, samesite='Lax'
+            )
+        return response
+
+
+class ReplicaReadMixin:
+    """
+    Отправить чтение действий replica_actions в реплику.
+    Ответы, которые попадут в кеш (CachedResponseMixin), читаются
+    из основной базы: иначе отставание реплики сразу после сброса
+    кеша закрепилось бы в нём на всё время жизни записи.
+    """
+
+    replica_actions = ('list', 'retrieve')
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if self.use_replica(request):
+            replica_reads.set(True)
+
+    def use_replica(self, request):
+        if (
+            request.method not in SAFE_METHODS
+            or self.action not in self.replica_actions
+            or getattr(request, 'read_primary', False)
+        ):
+            return False
+        is_cacheable = getattr(self, 'is_cacheable', None)
+        return is_cacheable is None or not is_cacheable(request)
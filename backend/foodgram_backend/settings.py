@@ -38,16 +38,24 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'foodgram_backend.db.ConnectionHealthCheckMiddleware',
+    'foodgram_backend.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'foodgram_backend.routers.ReplicaRoutingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
-ROOT_URLCONF = 'foodgram_backend.urls'
+# В режиме ASGI I/O-действия API обслуживаются асинхронными обработчиками.
+SERVER_MODE = os.getenv('SERVER_MODE', 'wsgi')
+ROOT_URLCONF = (
+    'foodgram_backend.asgi_urls' if SERVER_MODE == 'asgi'
+    else 'foodgram_backend.urls'
+)
 
 TEMPLATES = [
     {
@@ -75,10 +83,33 @@ DATABASES = {
         'USER': os.getenv('POSTGRES_USER', 'django'),
         'PASSWORD': os.getenv('POSTGRES_PASSWORD', ''),
         'HOST': os.getenv('DB_HOST', ''),
-        'PORT': os.getenv('DB_PORT', 5432)
+        'PORT': os.getenv('DB_PORT', 5432),
+        'CONN_MAX_AGE': int(os.getenv('CONN_MAX_AGE', 60)),
+        # PgBouncer в режиме transaction не сохраняет серверные курсоры
+        # между транзакциями.
+        'DISABLE_SERVER_SIDE_CURSORS': (
+            os.getenv('DB_PGBOUNCER', 'False') == 'True'
+        ),
     }
 }
 
+# Реплика для чтения list/retrieve; без DB_REPLICA_HOST всё идёт в default.
+if os.getenv('DB_REPLICA_HOST'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'HOST': os.getenv('DB_REPLICA_HOST'),
+        'PORT': os.getenv('DB_REPLICA_PORT', DATABASES['default']['PORT']),
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['foodgram_backend.routers.ReplicaRouter']
+
+# Сколько секунд после записи чтения клиента идут в основную базу.
+REPLICA_PIN_SECONDS = int(os.getenv('REPLICA_PIN_SECONDS', 5))
+
+CONN_HEALTH_CHECKS = os.getenv('CONN_HEALTH_CHECKS', 'True') == 'True'
+CONN_HEALTH_CHECK_INTERVAL = int(os.getenv('CONN_HEALTH_CHECK_INTERVAL', 10))
+
 
 '''DATABASES = {
     'default': {
@@ -122,6 +153,8 @@ STATIC_ROOT = BASE_DIR / 'collected_static'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = '/app/media'
 
+DEFAULT_FILE_STORAGE = 'foodgram_backend.storage.HashedFileSystemStorage'
+
 AUTH_USER_MODEL = 'users.MyUser'
 
 
@@ -135,7 +168,7 @@ REST_FRAMEWORK = {
     ],
 
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'users.authentication.CachedTokenAuthentication',
     ],
 
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
@@ -148,3 +181,62 @@ SIMPLE_JWT = {
 }
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+SHOPPING_LIST_PDF_FONT = os.getenv(
+    'SHOPPING_LIST_PDF_FONT',
+    '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf'
+)
+
+SHORT_LINK_SALT = int(os.getenv('SHORT_LINK_SALT', 100000))
+SHORT_LINK_CACHE_SIZE = int(os.getenv('SHORT_LINK_CACHE_SIZE', 4096))
+
+INGREDIENT_AUTOCOMPLETE_LIMIT = int(
+    os.getenv('INGREDIENT_AUTOCOMPLETE_LIMIT', 20)
+)
+INGREDIENT_INDEX_TTL = int(os.getenv('INGREDIENT_INDEX_TTL', 300))
+
+RECIPE_SEARCH_LIMIT = int(os.getenv('RECIPE_SEARCH_LIMIT', 200))
+RECIPE_SEARCH_INDEX_TTL = int(os.getenv('RECIPE_SEARCH_INDEX_TTL', 300))
+RECIPE_COVERAGE_INDEX = os.getenv('RECIPE_COVERAGE_INDEX', 'False') == 'True'
+RECIPE_COVERAGE_INDEX_TTL = int(os.getenv('RECIPE_COVERAGE_INDEX_TTL', 3600))
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
+    }
+}
+
+API_CACHE_ALIAS = 'default'
+API_CACHE_TIMEOUT = int(os.getenv('API_CACHE_TIMEOUT', 60))
+
+# Токены кешируются в общем кеше, если он настроен (Redis, Memcached):
+# тогда выход и смена пароля сразу действуют во всех воркерах.
+# Локальный кеш процесса отзывает токен в других воркерах только
+# по истечении TTL, поэтому для него TTL короткий.
+TOKEN_CACHE_ALIAS = os.getenv(
+    'TOKEN_CACHE_ALIAS',
+    '' if CACHES['default']['BACKEND'].endswith('LocMemCache') else 'default'
+)
+TOKEN_CACHE_TTL = int(
+    os.getenv('TOKEN_CACHE_TTL', 60 if TOKEN_CACHE_ALIAS else 5)
+)
+TOKEN_CACHE_SIZE = int(os.getenv('TOKEN_CACHE_SIZE', 10000))
+
+IMAGE_MAX_UPLOAD_SIZE = int(os.getenv('IMAGE_MAX_UPLOAD_SIZE', 10 * 1024 * 1024))
+IMAGE_FORMAT = os.getenv('IMAGE_FORMAT', 'WEBP')
+IMAGE_QUALITY = int(os.getenv('IMAGE_QUALITY', 85))
+IMAGE_MAX_SIDE = int(os.getenv('IMAGE_MAX_SIDE', 1600))
+RECIPE_THUMBNAIL_SIZE = (480, 320)
+AVATAR_THUMBNAIL_SIZE = (96, 96)
+IMAGE_PROCESSING_ASYNC = os.getenv('IMAGE_PROCESSING_ASYNC', 'False') == 'True'
+# Через сколько секунд задача в обработке считается брошенной.
+IMAGE_JOB_LEASE = int(os.getenv('IMAGE_JOB_LEASE', 300))
+
+# Без токена /api/metrics/ открыт только администраторам.
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+SLOW_QUERY_LOG = os.getenv('SLOW_QUERY_LOG', 'False') == 'True'
+SLOW_QUERY_MS = int(os.getenv('SLOW_QUERY_MS', 100))
+DUPLICATE_QUERY_THRESHOLD = int(os.getenv('DUPLICATE_QUERY_THRESHOLD', 5))
@@ -0,0 +1,34 @@
+import hashlib
+from pathlib import PurePosixPath
+
+from django.core.files.storage import FileSystemStorage
+
+HASH_LENGTH = 16
+
+
+class HashedFileSystemStorage(FileSystemStorage):
+    """
+    Хранилище медиа с хешем содержимого в имени файла.
+    Файл по одному адресу никогда не меняется, поэтому nginx
+    отдаёт такие файлы с Cache-Control: immutable.
+    """
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        path = PurePosixPath(name)
+        name = str(path.with_name(
+            f'{path.stem}.{self.content_hash(content)}{path.suffix}'
+        ))
+        return super().save(name, content, max_length=max_length)
+
+    @staticmethod
+    def content_hash(content):
+        digest = hashlib.sha256()
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        for chunk in content.chunks():
+            digest.update(chunk)
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        return digest.hexdigest()[:HASH_LENGTH]
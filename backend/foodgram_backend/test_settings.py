@@ -0,0 +1,24 @@
+"""
+Настройки для запуска тестов без PostgreSQL:
+python manage.py test --settings=foodgram_backend.test_settings
+"""
+import tempfile
+
+from .settings import *  # noqa: F401,F403
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+    },
+    # Реплика — зеркало default, чтобы тесты проходили через ReplicaRouter.
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+        'TEST': {'MIRROR': 'default'},
+    },
+}
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
@@ -0,0 +1,19 @@
+"""
+Настройки gunicorn.
+SERVER_MODE=asgi запускает uvicorn-воркеры с foodgram_backend.asgi,
+по умолчанию — синхронные воркеры с foodgram_backend.wsgi.
+В режиме ASGI I/O-действия API обслуживаются асинхронными
+обработчиками из foodgram_backend.asgi_urls.
+"""
+import os
+
+SERVER_MODE = os.getenv('SERVER_MODE', 'wsgi')
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:7000')
+workers = int(os.getenv('GUNICORN_WORKERS', 1))
+
+if SERVER_MODE == 'asgi':
+    wsgi_app = 'foodgram_backend.asgi:application'
+    worker_class = 'uvicorn.workers.UvicornWorker'
+else:
+    wsgi_app = 'foodgram_backend.wsgi:application'
@@ -0,0 +1,48 @@
+"""
+Асинхронные версии I/O-действий RecipeViewSet для режима ASGI
+(foodgram_backend.asgi_urls). Запросы к базе выполняются в пуле
+потоков, и один воркер обслуживает такие запросы параллельно.
+"""
+from django.http import HttpResponse, JsonResponse
+from django.shortcuts import redirect
+from django.urls import reverse
+
+from foodgram_backend.async_api import async_api_view, in_pool
+from .renderers import SHOPPING_LIST_RENDERERS, ShoppingListNegotiation
+from .shortlinks import aget_recipe_id, get_short_code
+from .views import shopping_list, shopping_list_response
+
+
+async def short_link_redirect(request, code):
+    """Перенаправить короткую ссылку на страницу рецепта."""
+    return redirect(f'/recipes/{await aget_recipe_id(code)}')
+
+
+@async_api_view('GET', login_required=False)
+async def get_short_link(request, pk):
+    """Получить короткую ссылку на рецепт."""
+    code = await in_pool(get_short_code)(pk)
+    return JsonResponse({
+        'short-link': request.build_absolute_uri(
+            reverse('short-link', args=(code,))
+        )
+    })
+
+
+def read_shopping_list(user):
+    """Строки списка покупок или None, если корзина пуста."""
+    if not user.shopping_cart.exists():
+        return None
+    return list(shopping_list(user))
+
+
+@async_api_view('GET')
+async def download_shopping_cart(request):
+    """Скачать список покупок в формате txt, csv или pdf."""
+    renderer, _ = ShoppingListNegotiation().select_renderer(
+        request, [renderer() for renderer in SHOPPING_LIST_RENDERERS]
+    )
+    ingredients = await in_pool(read_shopping_list)(request.user)
+    if ingredients is None:
+        return HttpResponse(status=400)
+    return shopping_list_response(request.user, renderer, ingredients)
@@ -0,0 +1,50 @@
+import time
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.test import APIClient
+
+
+def percentile(samples, percent):
+    samples = sorted(samples)
+    index = min(len(samples) - 1, int(len(samples) * percent / 100))
+    return samples[index]
+
+
+def summarize(timings, queries, errors=0):
+    """Сводка замеров: задержки в миллисекундах и число запросов к БД."""
+    total = sum(timings) / 1000
+    return {
+        'requests': len(timings),
+        'errors': errors,
+        'rps': len(timings) / total if total else 0,
+        'mean_ms': sum(timings) / len(timings) if timings else 0,
+        'p50_ms': percentile(timings, 50),
+        'p99_ms': percentile(timings, 99),
+        'queries': max(queries) if queries else 0,
+    }
+
+
+def measure_requests(url, repeat, user=None, warmup=0, **extra):
+    """
+    Выполнить GET url repeat раз через тестовый клиент Django.
+    Первые warmup запросов прогревают кеши и в замеры не входят.
+    """
+    client = APIClient()
+    if user is not None:
+        client.force_authenticate(user)
+    timings, queries, errors = [], [], 0
+    with override_settings(ALLOWED_HOSTS=['testserver']):
+        for number in range(warmup + repeat):
+            with CaptureQueriesContext(connection) as context:
+                started = time.perf_counter()
+                response = client.get(url, **extra)
+                if response.streaming:
+                    b''.join(response.streaming_content)
+                elapsed = (time.perf_counter() - started) * 1000
+            if number < warmup:
+                continue
+            timings.append(elapsed)
+            queries.append(len(context))
+            errors += response.status_code >= 400
+    return summarize(timings, queries, errors)
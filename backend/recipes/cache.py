@@ -0,0 +1,110 @@
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+
+VERSION_KEY = 'api-cache-version:{}'
+
+
+def get_cache():
+    return caches[settings.API_CACHE_ALIAS]
+
+
+def get_version(namespace):
+    return get_cache().get_or_set(VERSION_KEY.format(namespace), 1, None)
+
+
+def invalidate(*namespaces):
+    """
+    Сделать устаревшими все закешированные ответы пространств имён.
+    Версия меняется после коммита: иначе запрос, пришедший
+    до коммита, закешировал бы старые данные под новой версией.
+    """
+    transaction.on_commit(lambda: bump_versions(namespaces))
+
+
+def bump_versions(namespaces):
+    cache = get_cache()
+    for namespace in namespaces:
+        key = VERSION_KEY.format(namespace)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 2, None)
+
+
+def make_cache_key(namespace, request):
+    query = sorted(
+        (key, value) for key, values in request.query_params.lists()
+        for value in values
+    )
+    raw = f'{request.path}?{query}'.encode('utf-8')
+    return (
+        f'api-cache:{namespace}:{get_version(namespace)}:'
+        f'{hashlib.md5(raw).hexdigest()}'
+    )
+
+
+def make_etag(data):
+    content = json.dumps(data, cls=JSONEncoder, sort_keys=True)
+    return f'"{hashlib.md5(content.encode("utf-8")).hexdigest()}"'
+
+
+def etag_matches(etag, header):
+    """
+    Слабое сравнение для If-None-Match: список тегов,
+    префикс W/ не учитывается, * совпадает с любым.
+    """
+    if not header:
+        return False
+    etags = parse_etags(header)
+    if '*' in etags:
+        return True
+    return etag.lstrip('W/') in {tag.lstrip('W/') for tag in etags}
+
+
+class CachedResponseMixin:
+    """
+    Кеширование ответов list/retrieve по пути и строке запроса.
+    Ответы получают ETag, при совпадении If-None-Match отдаётся 304.
+    Кеш сбрасывается сменой версии пространства имён cache_namespace.
+    """
+
+    cache_namespace = None
+
+    def is_cacheable(self, request):
+        return True
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        if not self.is_cacheable(request):
+            return handler(request, *args, **kwargs)
+        cache = get_cache()
+        key = make_cache_key(self.cache_namespace, request)
+        cached = cache.get(key)
+        if cached is None:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            etag = make_etag(response.data)
+            cache.set(key, (response.data, etag), settings.API_CACHE_TIMEOUT)
+        else:
+            data, etag = cached
+            response = Response(data)
+        if etag_matches(etag, request.headers.get('If-None-Match')):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        response['ETag'] = etag
+        return response
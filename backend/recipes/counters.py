@@ -0,0 +1,37 @@
+from django.contrib.auth import get_user_model
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from .models import FavoriteRecipe, Recipe, ShoppingCart
+
+User = get_user_model()
+
+
+def change_counter(queryset, field, delta):
+    """Атомарно изменить счётчик на delta, не уходя ниже нуля."""
+    if delta < 0:
+        queryset = queryset.filter(**{f'{field}__gte': -delta})
+    queryset.update(**{field: F(field) + delta})
+
+
+def count_subquery(queryset, field):
+    """Подзапрос с числом строк queryset, связанных с OuterRef('pk')."""
+    return Coalesce(
+        Subquery(
+            queryset.filter(**{field: OuterRef('pk')}).values(
+                field
+            ).annotate(total=Count('pk')).values('total')
+        ),
+        Value(0)
+    )
+
+
+def recount():
+    """Пересчитать все счётчики по фактическим данным."""
+    Recipe.objects.update(
+        favorites_count=count_subquery(FavoriteRecipe.objects, 'recipe'),
+        in_carts_count=count_subquery(ShoppingCart.objects, 'recipe'),
+    )
+    User.objects.update(
+        recipes_count=count_subquery(Recipe.objects, 'author')
+    )
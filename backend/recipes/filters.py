@@ -2,6 +2,7 @@ from django.contrib.auth import get_user_model
 from django_filters.rest_framework import FilterSet, filters
 
 from recipes.models import Ingredients, Recipe, Tag
+from recipes.search import coverage_recipes, search_recipes
 
 User = get_user_model()
 
@@ -16,6 +17,10 @@ class IngredientFilter(FilterSet):
         fields = ['name']
 
 
+class NumberInFilter(filters.BaseInFilter, filters.NumberFilter):
+    pass
+
+
 class RecipeFilter(FilterSet):
     """Фильтр для рецептов."""
 
@@ -29,6 +34,8 @@ class RecipeFilter(FilterSet):
     is_in_shopping_cart = filters.BooleanFilter(
         method='filter_is_in_shopping_cart'
     )
+    search = filters.CharFilter(method='filter_search')
+    have = NumberInFilter(method='filter_have')
 
     class Meta:
         model = Recipe
@@ -45,3 +52,14 @@ class RecipeFilter(FilterSet):
         if value and not user.is_anonymous:
             return queryset.filter(shopping_cart__user=user)
         return queryset
+
+    def filter_search(self, queryset, name, value):
+        if not value.strip():
+            return queryset
+        return search_recipes(queryset, value)
+
+    def filter_have(self, queryset, name, value):
+        ingredient_ids = {int(id) for id in value}
+        if not ingredient_ids:
+            return queryset
+        return coverage_recipes(queryset, ingredient_ids)
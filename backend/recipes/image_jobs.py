@@ -0,0 +1,147 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from foodgram_backend.images import ImageStatus, render_variants
+from .cache import invalidate
+from .models import ImageJob
+
+# Модель -> поле изображения -> (миниатюра, статус, размер миниатюры).
+IMAGE_FIELDS = {
+    'recipes.recipe': {
+        'image': ('thumbnail', 'image_status', 'RECIPE_THUMBNAIL_SIZE'),
+    },
+    'users.myuser': {
+        'avatar': (
+            'avatar_thumbnail', 'avatar_status', 'AVATAR_THUMBNAIL_SIZE'
+        ),
+    },
+}
+
+
+def enqueue(instance, field):
+    """Поставить загруженное изображение в очередь на обработку."""
+    return ImageJob.objects.create(
+        content_type=ContentType.objects.get_for_model(instance),
+        object_id=instance.pk,
+        field=field,
+        source=getattr(instance, field).name,
+    )
+
+
+def claim(limit):
+    """
+    Забрать из очереди до limit задач, пропуская занятые другими.
+    Задачи, которые находятся в обработке дольше IMAGE_JOB_LEASE
+    секунд, считаются брошенными упавшим воркером и забираются снова.
+    """
+    now = timezone.now()
+    expired = now - timedelta(seconds=settings.IMAGE_JOB_LEASE)
+    with transaction.atomic():
+        jobs = list(
+            ImageJob.objects.select_for_update(skip_locked=True).filter(
+                Q(status=ImageJob.Status.PENDING)
+                | Q(status=ImageJob.Status.PROCESSING, claimed_at__lt=expired)
+                | Q(status=ImageJob.Status.PROCESSING, claimed_at=None)
+            ).select_related('content_type').order_by('id')[:limit]
+        )
+        ImageJob.objects.filter(pk__in=[job.pk for job in jobs]).update(
+            status=ImageJob.Status.PROCESSING, claimed_at=now
+        )
+    for job in jobs:
+        job.status = ImageJob.Status.PROCESSING
+        job.claimed_at = now
+    return jobs
+
+
+def close(job, **fields):
+    """
+    Записать итог задачи, если её не забрал другой воркер
+    после истечения аренды.
+    """
+    ImageJob.objects.filter(pk=job.pk, claimed_at=job.claimed_at).update(
+        **fields
+    )
+
+
+def job_config(job):
+    model = job.content_type.model_class()
+    target, status, size = IMAGE_FIELDS[model._meta.label_lower][job.field]
+    return model, target, status, getattr(settings, size)
+
+
+def read_source(job):
+    """Прочитать исходные байты изображения из хранилища."""
+    model, _, _, size = job_config(job)
+    storage = model._meta.get_field(job.field).storage
+    with storage.open(job.source) as file:
+        return file.read(), job.source, size
+
+
+def finish(job, variants):
+    """
+    Сохранить варианты изображения, если за время обработки
+    пользователь не загрузил новое, и удалить исходный файл.
+    Исходный файл удаляется и при проигранной гонке, иначе
+    он остался бы в хранилище без ссылок на него.
+    """
+    model, target, status, _ = job_config(job)
+    field = model._meta.get_field(job.field)
+    storage = field.storage
+    (image_name, image_data), (thumb_name, thumb_data) = variants
+    image_name = field.generate_filename(None, image_name)
+    thumb_name = model._meta.get_field(target).generate_filename(
+        None, thumb_name
+    )
+    image_name = storage.save(image_name, ContentFile(image_data))
+    thumb_name = storage.save(thumb_name, ContentFile(thumb_data))
+    updated = model.objects.filter(
+        pk=job.object_id, **{job.field: job.source}
+    ).update(**{
+        job.field: image_name,
+        target: thumb_name,
+        status: ImageStatus.READY,
+    })
+    storage.delete(job.source)
+    if updated:
+        invalidate('recipes')
+    else:
+        # Объект удалён или получил новое изображение: варианты
+        # и исходный файл больше никому не нужны.
+        storage.delete(image_name)
+        storage.delete(thumb_name)
+    close(job, status=ImageJob.Status.DONE)
+
+
+def fail(job, error):
+    model, _, status, _ = job_config(job)
+    updated = model.objects.filter(
+        pk=job.object_id, **{job.field: job.source}
+    ).update(**{status: ImageStatus.FAILED})
+    if not updated:
+        model._meta.get_field(job.field).storage.delete(job.source)
+    close(job, status=ImageJob.Status.FAILED, error=str(error))
+
+
+def process_batch(executor, limit):
+    """Обработать пачку задач в пуле процессов. Возвращает их число."""
+    jobs = claim(limit)
+    futures = []
+    for job in jobs:
+        try:
+            futures.append(
+                (job, executor.submit(render_variants, *read_source(job)))
+            )
+        except Exception as error:
+            fail(job, error)
+    for job, future in futures:
+        try:
+            finish(job, future.result())
+        except Exception as error:
+            fail(job, error)
+    return len(jobs)
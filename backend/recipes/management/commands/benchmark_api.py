@@ -0,0 +1,113 @@
+import json
+import platform
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.utils import timezone
+
+from recipes.benchmarks import measure_requests
+from recipes.models import Ingredients, Recipe
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Замерить пропускную способность, p50/p99 и число SQL-запросов '
+        'основных эндпоинтов API и вывести результат в JSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=100)
+        parser.add_argument('--warmup', type=int, default=5)
+        parser.add_argument('--limit', type=int, default=6)
+        parser.add_argument(
+            '--scenario', action='append', default=None,
+            help='Запустить только указанные сценарии (можно повторять).'
+        )
+        parser.add_argument('--label', default='')
+        parser.add_argument(
+            '--output', default=None,
+            help='Файл для JSON-результата; по умолчанию stdout.'
+        )
+
+    def scenarios(self, limit):
+        """Сценарии: имя -> (url, пользователь или None)."""
+        reader = User.objects.annotate(
+            cart=Count('shopping_cart', distinct=True),
+            follows=Count('followers', distinct=True),
+        ).order_by('-cart', '-follows').first()
+        recipe = Recipe.objects.order_by('-favorites_count', '-id').first()
+        ingredient = Ingredients.objects.order_by('id').first()
+        if reader is None or recipe is None or ingredient is None:
+            raise CommandError(
+                'Нет данных: выполните load_ingredients и seed_benchmark_data.'
+            )
+        prefix = ingredient.name[:2]
+        word = recipe.name.split()[0]
+        return {
+            'recipe_list': (f'/api/recipes/?limit={limit}', reader),
+            'recipe_list_anonymous': (f'/api/recipes/?limit={limit}', None),
+            'recipe_detail': (f'/api/recipes/{recipe.pk}/', reader),
+            'recipe_search': (
+                f'/api/recipes/?limit={limit}&search={word}', reader
+            ),
+            'shopping_list': (
+                '/api/recipes/download_shopping_cart/', reader
+            ),
+            'subscriptions': (
+                f'/api/users/subscriptions/?limit={limit}&recipes_limit=3',
+                reader
+            ),
+            'ingredient_search': (f'/api/ingredients/?name={prefix}', None),
+            'ingredient_autocomplete': (
+                f'/api/ingredients/autocomplete/?name={prefix}', None
+            ),
+        }
+
+    def handle(self, *args, **options):
+        scenarios = self.scenarios(options['limit'])
+        selected = options['scenario'] or list(scenarios)
+        unknown = set(selected) - scenarios.keys()
+        if unknown:
+            raise CommandError(
+                f'Неизвестные сценарии: {", ".join(sorted(unknown))}. '
+                f'Доступны: {", ".join(scenarios)}.'
+            )
+        results = {}
+        for name in selected:
+            url, user = scenarios[name]
+            results[name] = {
+                'url': url,
+                **measure_requests(
+                    url, options['repeat'], user=user,
+                    warmup=options['warmup']
+                ),
+            }
+            self.stderr.write(
+                f'{name}: {results[name]["rps"]:.1f} rps '
+                f'p50={results[name]["p50_ms"]:.2f}ms '
+                f'p99={results[name]["p99_ms"]:.2f}ms '
+                f'queries={results[name]["queries"]}'
+            )
+        report = json.dumps({
+            'label': options['label'],
+            'started_at': timezone.now().isoformat(),
+            'environment': {
+                'python': platform.python_version(),
+                'database': connection.vendor,
+                'recipes': Recipe.objects.count(),
+                'users': User.objects.count(),
+                'ingredients': Ingredients.objects.count(),
+            },
+            'repeat': options['repeat'],
+            'warmup': options['warmup'],
+            'results': results,
+        }, ensure_ascii=False, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                file.write(report)
+        else:
+            self.stdout.write(report)
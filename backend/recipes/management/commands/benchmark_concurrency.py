@@ -0,0 +1,91 @@
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.core.management.base import BaseCommand, CommandError
+
+from recipes.benchmarks import summarize
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагрузить запущенный сервер параллельными запросами '
+        'и сравнить пропускную способность при разной конкурентности. '
+        'Запускается против WSGI и ASGI с одинаковым числом воркеров.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'url', help='Полный адрес, например http://localhost:7000/s/1C/.'
+        )
+        parser.add_argument(
+            '--concurrency', type=int, nargs='+', default=[1, 8, 32]
+        )
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument(
+            '--token', default=None, help='Токен для заголовка Authorization.'
+        )
+        parser.add_argument('--method', default='GET')
+        parser.add_argument(
+            '--body', default=None, help='Файл с JSON-телом запроса.'
+        )
+        parser.add_argument('--label', default='')
+        parser.add_argument('--output', default=None)
+
+    def handle(self, *args, **options):
+        headers = {}
+        if options['token']:
+            headers['Authorization'] = f'Token {options["token"]}'
+        url = options['url']
+        body = None
+        if options['body']:
+            with open(options['body'], 'rb') as file:
+                body = file.read()
+            headers['Content-Type'] = 'application/json'
+
+        def fetch(_):
+            started = time.perf_counter()
+            response = requests.request(
+                options['method'], url, data=body, headers=headers,
+                allow_redirects=False
+            )
+            return (
+                (time.perf_counter() - started) * 1000,
+                response.status_code >= 400
+            )
+
+        results = {}
+        for concurrency in options['concurrency']:
+            started = time.perf_counter()
+            try:
+                with ThreadPoolExecutor(concurrency) as executor:
+                    samples = list(executor.map(
+                        fetch, range(options['requests'])
+                    ))
+            except requests.ConnectionError as error:
+                raise CommandError(f'Сервер недоступен: {error}')
+            elapsed = time.perf_counter() - started
+            timings = [timing for timing, _ in samples]
+            result = summarize(
+                timings, [], sum(error for _, error in samples)
+            )
+            result['rps'] = len(samples) / elapsed
+            del result['queries']
+            results[concurrency] = result
+            self.stderr.write(
+                f'concurrency={concurrency}: {result["rps"]:.1f} rps '
+                f'p50={result["p50_ms"]:.2f}ms p99={result["p99_ms"]:.2f}ms'
+            )
+        report = json.dumps({
+            'label': options['label'],
+            'url': url,
+            'method': options['method'],
+            'requests': options['requests'],
+            'results': results,
+        }, ensure_ascii=False, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                file.write(report)
+        else:
+            self.stdout.write(report)
@@ -0,0 +1,75 @@
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from recipes.benchmarks import summarize
+
+MODES = ('fresh', 'persistent', 'health_check')
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнить задержку запроса к базе с новым соединением, '
+        'с постоянным соединением и с постоянным плюс проверка '
+        'is_usable() при разной конкурентности.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default')
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument(
+            '--concurrency', type=int, nargs='+', default=[1, 8, 32]
+        )
+        parser.add_argument('--query', default='SELECT 1')
+        parser.add_argument('--output', default=None)
+
+    def handle(self, *args, **options):
+        alias = options['database']
+        query = options['query']
+
+        def run(mode):
+            connection = connections[alias]
+            started = time.perf_counter()
+            if mode == 'fresh':
+                connection.close()
+            elif mode == 'health_check' and connection.connection is not None:
+                if not connection.is_usable():
+                    connection.close()
+            with connection.cursor() as cursor:
+                cursor.execute(query)
+                cursor.fetchall()
+            return (time.perf_counter() - started) * 1000
+
+        results = {}
+        for mode in MODES:
+            results[mode] = {}
+            for concurrency in options['concurrency']:
+                with ThreadPoolExecutor(concurrency) as executor:
+                    started = time.perf_counter()
+                    timings = list(executor.map(
+                        run, [mode] * options['requests']
+                    ))
+                    elapsed = time.perf_counter() - started
+                result = summarize(timings, [])
+                result['rps'] = len(timings) / elapsed
+                del result['queries']
+                results[mode][concurrency] = result
+                self.stderr.write(
+                    f'{mode} concurrency={concurrency}: '
+                    f'{result["rps"]:.1f} rps p50={result["p50_ms"]:.2f}ms '
+                    f'p99={result["p99_ms"]:.2f}ms'
+                )
+        report = json.dumps({
+            'database': connections[alias].vendor,
+            'query': query,
+            'requests': options['requests'],
+            'results': results,
+        }, ensure_ascii=False, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                file.write(report)
+        else:
+            self.stdout.write(report)
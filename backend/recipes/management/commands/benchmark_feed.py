@@ -0,0 +1,44 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+
+from recipes.benchmarks import measure_requests
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнить ленту подписок /api/recipes/feed/ '
+        'с обходом /api/users/subscriptions/ по авторам.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user', type=int, default=None,
+            help='id читателя; по умолчанию подписанный на больше всех.'
+        )
+        parser.add_argument('--repeat', type=int, default=50)
+        parser.add_argument('--limit', type=int, default=10)
+
+    def handle(self, *args, **options):
+        users = User.objects.annotate(follows=Count('followers'))
+        if options['user'] is not None:
+            users = users.filter(pk=options['user'])
+        user = users.order_by('-follows').first()
+        if user is None or not user.follows:
+            raise CommandError('Нет пользователя с подписками.')
+        limit = options['limit']
+        urls = {
+            'subscriptions': (
+                f'/api/users/subscriptions/?limit={limit}&recipes_limit=3'
+            ),
+            'feed': f'/api/recipes/feed/?limit={limit}',
+        }
+        self.stdout.write(f'Пользователь {user.pk}, подписок: {user.follows}')
+        for name, url in urls.items():
+            result = measure_requests(url, options['repeat'], user=user)
+            self.stdout.write(
+                f'{name}: p50={result["p50_ms"]:.2f}ms '
+                f'p99={result["p99_ms"]:.2f}ms queries={result["queries"]}'
+            )
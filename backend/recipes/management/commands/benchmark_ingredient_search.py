@@ -0,0 +1,82 @@
+import random
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from recipes.benchmarks import percentile
+from recipes.models import Ingredients
+from recipes.search import IngredientIndex
+
+PREFIX_INDEX = 'ingredient_name_prefix_idx'
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнить задержки поиска ингредиентов: исходный '
+        'name__startswith по таблице без индекса, тот же фильтр '
+        'с индексом varchar_pattern_ops и индекс автодополнения. '
+        'На PostgreSQL индекс на время замера удаляется в транзакции '
+        'и восстанавливается откатом; таблица в это время заблокирована.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--queries', type=int, default=500)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def measure(self, func, queries):
+        timings = []
+        for query in queries:
+            started = time.perf_counter()
+            func(query)
+            timings.append((time.perf_counter() - started) * 1000)
+        return timings
+
+    @contextmanager
+    def without_prefix_index(self):
+        """
+        Состояние до индекса. В SQLite LIKE с ESCAPE индекс
+        не использует, поэтому удалять нечего.
+        """
+        if connection.vendor != 'postgresql':
+            yield
+            return
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute(f'DROP INDEX IF EXISTS {PREFIX_INDEX}')
+            yield
+            transaction.set_rollback(True)
+
+    def handle(self, *args, **options):
+        names = list(Ingredients.objects.values_list('name', flat=True))
+        if not names:
+            raise CommandError('Таблица ингредиентов пуста.')
+        rng = random.Random(options['seed'])
+        queries = [
+            rng.choice(names)[:rng.randint(1, 4)]
+            for _ in range(options['queries'])
+        ]
+        limit = settings.INGREDIENT_AUTOCOMPLETE_LIMIT
+        index = IngredientIndex()
+        index.search(queries[0], limit)
+
+        def startswith(query):
+            return list(Ingredients.objects.filter(name__startswith=query))
+
+        results = {}
+        with self.without_prefix_index():
+            results['startswith_unindexed'] = self.measure(
+                startswith, queries
+            )
+        if connection.vendor == 'postgresql':
+            results['startswith_indexed'] = self.measure(startswith, queries)
+        results['index'] = self.measure(
+            lambda query: index.search(query, limit), queries
+        )
+        for name, timings in results.items():
+            self.stdout.write(
+                f'{name}: p50={percentile(timings, 50):.3f}ms '
+                f'p99={percentile(timings, 99):.3f}ms'
+            )
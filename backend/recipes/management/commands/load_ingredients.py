@@ -0,0 +1,134 @@
+import csv
+import io
+import json
+import time
+from itertools import islice
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from recipes.cache import invalidate
+from recipes.models import Ingredients
+
+DEFAULT_PATH = settings.BASE_DIR.parent / 'data' / 'ingredients.csv'
+JSON_READ_SIZE = 64 * 1024
+
+
+def iter_csv(file):
+    """Построчно читать пары (название, единица измерения) из CSV."""
+    for row in csv.reader(file):
+        if len(row) >= 2:
+            yield row[0], row[1]
+
+
+def iter_json(file):
+    """Читать объекты массива JSON по одному, не загружая файл целиком."""
+    decoder = json.JSONDecoder()
+    buffer = ''
+    eof = False
+    while True:
+        buffer = buffer.lstrip().lstrip('[,').lstrip()
+        if buffer.startswith(']'):
+            return
+        try:
+            item, end = decoder.raw_decode(buffer)
+        except json.JSONDecodeError:
+            if eof:
+                if buffer:
+                    raise CommandError('Некорректный JSON.')
+                return
+            chunk = file.read(JSON_READ_SIZE)
+            eof = not chunk
+            buffer += chunk
+            continue
+        buffer = buffer[end:]
+        yield item['name'], item['measurement_unit']
+
+
+def iter_new_rows(rows, known_names):
+    """Отбросить пустые строки и названия, которые уже есть в базе."""
+    for name, measurement_unit in rows:
+        name, measurement_unit = name.strip(), measurement_unit.strip()
+        if not name or name in known_names:
+            continue
+        known_names.add(name)
+        yield name, measurement_unit
+
+
+def batches(rows, size):
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+
+class Command(BaseCommand):
+    help = (
+        'Загрузить ингредиенты из CSV или JSON. '
+        'Повторный запуск добавляет только новые записи.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default=str(DEFAULT_PATH))
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--copy', action='store_true',
+            help='Загрузка через COPY (только PostgreSQL).'
+        )
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        if not path.exists():
+            raise CommandError(f'Файл {path} не найден.')
+        if options['copy'] and connection.vendor != 'postgresql':
+            raise CommandError('--copy поддерживается только в PostgreSQL.')
+        reader = iter_json if path.suffix == '.json' else iter_csv
+
+        started = time.perf_counter()
+        known_names = set(Ingredients.objects.values_list('name', flat=True))
+        existing = len(known_names)
+        with open(path, encoding='utf-8') as file:
+            rows = iter_new_rows(reader(file), known_names)
+            for batch in batches(rows, options['batch_size']):
+                if options['copy']:
+                    self.copy_batch(batch)
+                else:
+                    Ingredients.objects.bulk_create(
+                        [Ingredients(name=name, measurement_unit=unit)
+                         for name, unit in batch],
+                        ignore_conflicts=True
+                    )
+        elapsed = time.perf_counter() - started
+        added = Ingredients.objects.count() - existing
+        if added:
+            invalidate('ingredients', 'recipes')
+        self.stdout.write(self.style.SUCCESS(
+            f'Добавлено {added} ингредиентов за {elapsed:.2f} с '
+            f'({added / elapsed if elapsed else 0:.0f} строк/с).'
+        ))
+
+    def copy_batch(self, batch):
+        """Загрузить пачку через COPY во временную таблицу."""
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(batch)
+        buffer.seek(0)
+        table = Ingredients._meta.db_table
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                'CREATE TEMP TABLE ingredients_load '
+                '(name varchar, measurement_unit varchar) ON COMMIT DROP'
+            )
+            cursor.copy_expert(
+                'COPY ingredients_load (name, measurement_unit) '
+                'FROM STDIN WITH (FORMAT csv)',
+                buffer
+            )
+            cursor.execute(
+                f'INSERT INTO {table} (name, measurement_unit) '
+                'SELECT name, measurement_unit FROM ingredients_load '
+                'ON CONFLICT (name) DO NOTHING'
+            )
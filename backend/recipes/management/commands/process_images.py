@@ -0,0 +1,38 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from recipes.image_jobs import process_batch
+
+
+class Command(BaseCommand):
+    help = (
+        'Фоновая обработка загруженных изображений: '
+        'нормализация и миниатюры в пуле процессов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=None)
+        parser.add_argument('--batch-size', type=int, default=16)
+        parser.add_argument(
+            '--interval', type=float, default=1.0,
+            help='Пауза между опросами пустой очереди, секунды.'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Обработать очередь и завершиться.'
+        )
+
+    def handle(self, *args, **options):
+        with ProcessPoolExecutor(max_workers=options['workers']) as executor:
+            while True:
+                close_old_connections()
+                processed = process_batch(executor, options['batch_size'])
+                if processed:
+                    self.stdout.write(f'Обработано изображений: {processed}')
+                    continue
+                if options['once']:
+                    return
+                time.sleep(options['interval'])
@@ -0,0 +1,199 @@
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from recipes.cache import invalidate
+from recipes.counters import recount
+from recipes.models import (
+    FavoriteRecipe, Ingredients, Recipe, RecipeIngredients, RecipeTags,
+    ShoppingCart, Tag
+)
+from recipes.search import recipe_search_vector
+from users.models import Follow
+
+User = get_user_model()
+
+WORDS = (
+    'борщ', 'суп', 'салат', 'пирог', 'каша', 'рагу', 'омлет', 'плов',
+    'курица', 'говядина', 'рыба', 'грибы', 'картофель', 'капуста', 'сыр',
+    'томат', 'лук', 'чеснок', 'рис', 'гречка', 'тыква', 'яблоко', 'мёд',
+)
+TAGS = (('Завтрак', 'breakfast'), ('Обед', 'lunch'), ('Ужин', 'dinner'))
+PLACEHOLDER_IMAGE = 'recipes/images/benchmark.png'
+
+
+class Command(BaseCommand):
+    help = (
+        'Сгенерировать синтетических пользователей, рецепты, состав, '
+        'избранное, корзины и подписки для нагрузочных замеров.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--recipes', type=int, default=10000)
+        parser.add_argument(
+            '--ingredients-per-recipe', type=int, default=8,
+            help='Среднее число ингредиентов в рецепте.'
+        )
+        parser.add_argument(
+            '--favorites', type=int, default=20,
+            help='Среднее число избранных рецептов на пользователя.'
+        )
+        parser.add_argument(
+            '--carts', type=int, default=5,
+            help='Среднее число рецептов в корзине пользователя.'
+        )
+        parser.add_argument(
+            '--follows', type=int, default=10,
+            help='Среднее число подписок на пользователя.'
+        )
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--prefix', default='bench',
+            help='Префикс имён сгенерированных пользователей.'
+        )
+        parser.add_argument(
+            '--clear', action='store_true',
+            help='Удалить ранее сгенерированные данные с этим префиксом.'
+        )
+
+    def handle(self, *args, **options):
+        self.random = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        prefix = options['prefix']
+        if options['clear']:
+            deleted, _ = User.objects.filter(
+                username__startswith=f'{prefix}_'
+            ).delete()
+            self.stdout.write(f'Удалено объектов: {deleted}')
+        ingredient_ids = list(
+            Ingredients.objects.values_list('id', flat=True)
+        )
+        if not ingredient_ids:
+            raise CommandError(
+                'Нет ингредиентов: сначала выполните load_ingredients.'
+            )
+        started = time.perf_counter()
+        with transaction.atomic():
+            tag_ids = self.create_tags()
+            user_ids = self.create_users(prefix, options['users'])
+            recipe_ids = self.create_recipes(user_ids, options['recipes'])
+            self.create_through(
+                recipe_ids, ingredient_ids, tag_ids,
+                options['ingredients_per_recipe']
+            )
+            self.create_pairs(
+                FavoriteRecipe, 'recipe_id', user_ids, recipe_ids,
+                options['favorites']
+            )
+            self.create_pairs(
+                ShoppingCart, 'recipe_id', user_ids, recipe_ids,
+                options['carts']
+            )
+            self.create_pairs(
+                Follow, 'following_id', user_ids, user_ids,
+                options['follows']
+            )
+            recount()
+            if connection.vendor == 'postgresql':
+                Recipe.objects.filter(id__in=recipe_ids).update(
+                    search_vector=recipe_search_vector()
+                )
+        invalidate('recipes')
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано {len(user_ids)} пользователей и {len(recipe_ids)} '
+            f'рецептов за {time.perf_counter() - started:.1f} с.'
+        ))
+
+    def bulk_create(self, model, objects):
+        model.objects.bulk_create(objects, batch_size=self.batch_size)
+
+    def create_tags(self):
+        for name, slug in TAGS:
+            Tag.objects.get_or_create(slug=slug, defaults={'name': name})
+        return list(Tag.objects.values_list('id', flat=True))
+
+    def create_users(self, prefix, count):
+        start = User.objects.filter(username__startswith=f'{prefix}_').count()
+        usernames = [f'{prefix}_{number}' for number in range(
+            start, start + count
+        )]
+        self.bulk_create(User, [
+            User(
+                username=username, email=f'{username}@example.com',
+                first_name='Тест', last_name=username, password=username
+            ) for username in usernames
+        ])
+        return list(User.objects.filter(
+            username__in=usernames
+        ).values_list('id', flat=True))
+
+    def sentence(self, length):
+        return ' '.join(self.random.choices(WORDS, k=length))
+
+    def create_recipes(self, user_ids, count):
+        first_id = (
+            Recipe.objects.order_by('-id').values_list('id', flat=True).first()
+            or 0
+        )
+        self.bulk_create(Recipe, [
+            Recipe(
+                author_id=self.random.choice(user_ids),
+                name=self.sentence(3).capitalize(),
+                text=self.sentence(40).capitalize(),
+                cooking_time=self.random.randint(5, 240),
+                image=PLACEHOLDER_IMAGE,
+            ) for _ in range(count)
+        ])
+        return list(Recipe.objects.filter(id__gt=first_id).values_list(
+            'id', flat=True
+        ))
+
+    def create_through(self, recipe_ids, ingredient_ids, tag_ids, average):
+        amounts, tags = [], []
+        for recipe_id in recipe_ids:
+            count = min(
+                len(ingredient_ids),
+                max(1, int(self.random.gauss(average, average / 3)))
+            )
+            amounts.extend(
+                RecipeIngredients(
+                    recipe_id=recipe_id, ingredients_id=ingredient_id,
+                    amount=self.random.randint(1, 500)
+                ) for ingredient_id in self.random.sample(
+                    ingredient_ids, count
+                )
+            )
+            tags.extend(
+                RecipeTags(recipe_id=recipe_id, tags_id=tag_id)
+                for tag_id in self.random.sample(
+                    tag_ids, self.random.randint(1, len(tag_ids))
+                )
+            )
+            if len(amounts) >= self.batch_size:
+                self.bulk_create(RecipeIngredients, amounts)
+                amounts = []
+        self.bulk_create(RecipeIngredients, amounts)
+        self.bulk_create(RecipeTags, tags)
+
+    def create_pairs(self, model, field, user_ids, target_ids, average):
+        """Уникальные пары (пользователь, объект) без ссылок на себя."""
+        objects = []
+        for user_id in user_ids:
+            count = min(
+                len(target_ids) - 1, self.random.randint(0, 2 * average)
+            )
+            targets = set(self.random.sample(target_ids, max(0, count)))
+            targets.discard(user_id if field == 'following_id' else None)
+            objects.extend(
+                model(user_id=user_id, **{field: target_id})
+                for target_id in targets
+            )
+            if len(objects) >= self.batch_size:
+                self.bulk_create(model, objects)
+                objects = []
+        self.bulk_create(model, objects)
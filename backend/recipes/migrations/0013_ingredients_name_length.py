@@ -0,0 +1,18 @@
+# Generated by Django 3.2.3 on 2026-10-18 06:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0012_ingredient_name_prefix_idx'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='ingredients',
+            name='name',
+            field=models.CharField(max_length=128, unique=True, verbose_name='Название'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 3.2.3 on 2026-10-18 06:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0020_recipe_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='recipeingredients',
+            index=models.Index(fields=['ingredients', 'recipe'], name='recipe_ingredient_cover_idx'),
+        ),
+    ]
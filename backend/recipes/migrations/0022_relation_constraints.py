@@ -0,0 +1,80 @@
+# Generated by Django 3.2.3 on 2026-10-18 06:45
+
+from django.db import migrations, models
+from django.db.models import Count, Min, Sum
+
+UNIQUE_FIELDS = {
+    'RecipeIngredients': ('recipe', 'ingredients'),
+    'RecipeTags': ('recipe', 'tags'),
+    'FavoriteRecipe': ('user', 'recipe'),
+}
+
+# Наибольшее допустимое количество ингредиента (recipes.models.MAX_VALUE).
+MAX_AMOUNT = 32000
+
+
+def remove_duplicates(apps, schema_editor):
+    """
+    Оставить по одной строке (с наименьшим id) на каждую пару,
+    иначе уникальные ограничения не создадутся.
+    Количества повторяющегося ингредиента складываются в оставшуюся
+    строку, чтобы рецепт не потерял его часть.
+    Счётчик избранного пересчитывается для затронутых рецептов.
+    """
+    alias = schema_editor.connection.alias
+    for name, fields in UNIQUE_FIELDS.items():
+        model = apps.get_model('recipes', name)
+        duplicates = model.objects.using(alias).values(*fields).annotate(
+            keep=Min('id'), total=Count('id')
+        ).filter(total__gt=1)
+        if name == 'RecipeIngredients':
+            duplicates = duplicates.annotate(total_amount=Sum('amount'))
+        recipe_ids = set()
+        for row in duplicates:
+            keep = row.pop('keep')
+            row.pop('total')
+            amount = row.pop('total_amount', None)
+            if amount is not None:
+                model.objects.using(alias).filter(id=keep).update(
+                    amount=min(amount, MAX_AMOUNT)
+                )
+            model.objects.using(alias).filter(**row).exclude(
+                id=keep
+            ).delete()
+            recipe_ids.add(row['recipe'])
+        if name == 'FavoriteRecipe' and recipe_ids:
+            Recipe = apps.get_model('recipes', 'Recipe')
+            for recipe in Recipe.objects.using(alias).filter(
+                id__in=recipe_ids
+            ):
+                recipe.favorites_count = model.objects.using(alias).filter(
+                    recipe=recipe
+                ).count()
+                recipe.save(update_fields=('favorites_count',))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0021_recipe_ingredient_cover_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicates, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='recipetags',
+            index=models.Index(fields=['tags', 'recipe'], name='recipe_tag_cover_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='favoriterecipe',
+            constraint=models.UniqueConstraint(fields=('user', 'recipe'), name='unique_favorite_recipe'),
+        ),
+        migrations.AddConstraint(
+            model_name='recipeingredients',
+            constraint=models.UniqueConstraint(fields=('recipe', 'ingredients'), name='unique_recipe_ingredient'),
+        ),
+        migrations.AddConstraint(
+            model_name='recipetags',
+            constraint=models.UniqueConstraint(fields=('recipe', 'tags'), name='unique_recipe_tag'),
+        ),
+    ]
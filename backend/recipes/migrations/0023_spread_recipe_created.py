@@ -0,0 +1,35 @@
+from datetime import timedelta
+
+from django.db import migrations
+from django.db.models import Count
+
+
+def spread_created(apps, schema_editor):
+    """
+    0016 выставила всем существующим рецептам одно и то же время.
+    Совпадающие значения разносятся по микросекундам в порядке id,
+    чтобы сортировка по created повторяла порядок добавления.
+    """
+    Recipe = apps.get_model('recipes', 'Recipe')
+    recipes = Recipe.objects.using(schema_editor.connection.alias)
+    tied = recipes.values('created').annotate(
+        total=Count('id')
+    ).filter(total__gt=1).order_by()
+    for row in tied:
+        group = list(recipes.filter(created=row['created']).order_by(
+            '-id'
+        ).only('id', 'created'))
+        for offset, recipe in enumerate(group):
+            recipe.created = row['created'] - timedelta(microseconds=offset)
+        recipes.bulk_update(group, ('created',), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0022_relation_constraints'),
+    ]
+
+    operations = [
+        migrations.RunPython(spread_created, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.3 on 2026-10-18 07:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0023_spread_recipe_created'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='imagejob',
+            name='claimed_at',
+            field=models.DateTimeField(null=True, verbose_name='Взята в обработку'),
+        ),
+    ]
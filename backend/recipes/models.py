@@ -1,7 +1,18 @@
-from django.db import models
+from django.db import connections, models, router, transaction
+from django.db.models import (
+    Count, Exists, F, OuterRef, Prefetch, Q, Value, Window
+)
+from django.db.models.functions import RowNumber
+from django.db.models.signals import post_save
 from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.fields import GenericForeignKey
+from django.contrib.contenttypes.models import ContentType
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MinValueValidator, MaxValueValidator
 
+from foodgram_backend.images import ImageStatus
+from users.models import Follow
+
 # from .serializers import MAX_VALUE, MIN_VALUE
 
 User = get_user_model()
@@ -23,13 +34,112 @@ class Tag(models.Model):
 class Ingredients(models.Model):
     """Модель ингридиентов."""
 
-    name = models.CharField('Название', max_length=16, unique=True)
+    name = models.CharField('Название', max_length=128, unique=True)
     measurement_unit = models.CharField('Единица измерения', max_length=10)
 
+    class Meta:
+        indexes = (
+            models.Index(
+                fields=('name',),
+                name='ingredient_name_prefix_idx',
+                opclasses=('varchar_pattern_ops',)
+            ),
+        )
+
     def __str__(self) -> str:
         return self.name
 
 
+class RecipeQuerySet(models.QuerySet):
+    """Выборки рецептов для чтения."""
+
+    def with_related(self):
+        """Подгрузить автора, тэги и ингредиенты фиксированным числом
+        запросов."""
+        return self.select_related('author').prefetch_related(
+            'tags',
+            Prefetch(
+                'recipeingredients_set',
+                queryset=RecipeIngredients.objects.select_related(
+                    'ingredients'
+                ),
+                to_attr='ingredient_amounts'
+            )
+        )
+
+    def feed(self, user):
+        """Рецепты авторов, на которых подписан user, одним соединением."""
+        return self.filter(author__following__user=user)
+
+    def latest_by_author(self, author_ids, limit=None):
+        """
+        Последние limit рецептов каждого автора одним запросом
+        с ROW_NUMBER() OVER (PARTITION BY author_id).
+        """
+        queryset = self.filter(author_id__in=author_ids)
+        if limit is None or not author_ids:
+            return queryset
+        ranked = queryset.annotate(position=Window(
+            RowNumber(),
+            partition_by=F('author_id'),
+            order_by=(F('created').desc(), F('id').desc()),
+        )).order_by()
+        sql, params = ranked.query.sql_with_params()
+        return self.model.objects.raw(
+            f'SELECT * FROM ({sql}) ranked WHERE ranked.position <= %s '
+            'ORDER BY ranked.author_id, ranked.position',
+            (*params, limit)
+        )
+
+    def by_coverage(self, ingredient_ids):
+        """
+        Рецепты хотя бы с одним из ингредиентов пользователя:
+        больше совпавших и меньше недостающих — выше.
+        Кандидаты выбираются по индексу (ingredients_id, recipe_id)
+        промежуточной таблицы, совпадения считаются одной агрегацией.
+        """
+        return self.filter(id__in=RecipeIngredients.objects.filter(
+            ingredients_id__in=ingredient_ids
+        ).values('recipe_id')).annotate(
+            matched_ingredients=Count(
+                'recipeingredients',
+                filter=Q(recipeingredients__ingredients_id__in=ingredient_ids),
+                distinct=True
+            ),
+            missing_ingredients=Count(
+                'recipeingredients',
+                filter=~Q(
+                    recipeingredients__ingredients_id__in=ingredient_ids
+                ),
+                distinct=True
+            ),
+        ).order_by('-matched_ingredients', 'missing_ingredients', '-id')
+
+    def with_user_flags(self, user):
+        """Аннотировать флаги избранного, корзины и подписки на автора."""
+        if user.is_anonymous:
+            return self.annotate(
+                is_favorited=Value(False, output_field=models.BooleanField()),
+                is_in_shopping_cart=Value(
+                    False, output_field=models.BooleanField()
+                ),
+                author_is_subscribed=Value(
+                    False, output_field=models.BooleanField()
+                ),
+            )
+        return self.annotate(
+            is_favorited=Exists(FavoriteRecipe.objects.filter(
+                user=user, recipe=OuterRef('pk')
+            )),
+            is_in_shopping_cart=Exists(ShoppingCart.objects.filter(
+                user=user, recipe=OuterRef('pk')
+            )),
+            author_is_subscribed=Exists(Follow.objects.filter(
+                user=user, following=OuterRef('author')
+            )),
+        )
+
+
 class Recipe(models.Model):
     """Модель рецептов."""
 
@@ -41,6 +151,15 @@ class Recipe(models.Model):
     image = models.ImageField(
         upload_to='recipes/images/',
     )
+    thumbnail = models.ImageField(
+        'Миниатюра', upload_to='recipes/thumbnails/',
+        blank=True, editable=False
+    )
+    image_status = models.CharField(
+        'Статус обработки изображения', max_length=16,
+        choices=ImageStatus.choices, default=ImageStatus.READY,
+        editable=False
+    )
     text = models.TextField('Описание')
     ingredients = models.ManyToManyField(Ingredients,
                                          through='RecipeIngredients',
@@ -61,6 +180,36 @@ class Recipe(models.Model):
         ]
     )
 
+    created = models.DateTimeField('Дата публикации', auto_now_add=True)
+    search_vector = SearchVectorField(null=True, editable=False)
+    favorites_count = models.PositiveIntegerField(
+        'Количество в избранных', default=0, editable=False
+    )
+    in_carts_count = models.PositiveIntegerField(
+        'Количество в корзинах', default=0, editable=False
+    )
+
+    objects = RecipeQuerySet.as_manager()
+
+    class Meta:
+        ordering = ('-created', '-id')
+        indexes = (
+            models.Index(
+                fields=('-created', '-id'), name='recipe_created_idx'
+            ),
+            models.Index(
+                fields=('-favorites_count', '-id'),
+                name='recipe_favorites_idx'
+            ),
+            models.Index(
+                fields=('cooking_time', 'id'), name='recipe_cooking_time_idx'
+            ),
+            models.Index(
+                fields=('author', '-created', '-id'),
+                name='recipe_author_created_idx'
+            ),
+        )
+
     def __str__(self) -> str:
         return self.name
 
@@ -84,6 +233,18 @@ class RecipeIngredients(models.Model):
         ]
     )
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['ingredients', 'recipe'],
+                name='recipe_ingredient_cover_idx'
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['recipe', 'ingredients'],
+                                    name='unique_recipe_ingredient')
+        ]
+
 
 class RecipeTags(models.Model):
     """Промежуточная модель рецепт - тэг."""
@@ -91,6 +252,51 @@ class RecipeTags(models.Model):
     recipe = models.ForeignKey(Recipe, on_delete=models.CASCADE)
     tags = models.ForeignKey(Tag, on_delete=models.CASCADE)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['tags', 'recipe'], name='recipe_tag_cover_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['recipe', 'tags'],
+                                    name='unique_recipe_tag')
+        ]
+
+
+class UserRecipeQuerySet(models.QuerySet):
+
+    def add(self, user, recipe):
+        """
+        Добавить пару пользователь - рецепт одним
+        INSERT ... ON CONFLICT DO NOTHING вместо проверки exists()
+        и отдельной вставки. Вернуть True, если строка создана.
+        post_save отправляется только для новой строки,
+        чтобы счётчики рецепта менялись как при create(),
+        и в одной транзакции со вставкой.
+        """
+        model = self.model
+        db = self._db or router.db_for_write(model, instance=recipe)
+        connection = connections[db]
+        quote = connection.ops.quote_name
+        with transaction.atomic(using=db):
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'INSERT INTO {quote(model._meta.db_table)} '
+                    '(user_id, recipe_id) VALUES (%s, %s) '
+                    'ON CONFLICT DO NOTHING RETURNING id',
+                    [user.pk, recipe.pk]
+                )
+                row = cursor.fetchone()
+            if row is None:
+                return False
+            instance = model(id=row[0], user=user, recipe=recipe)
+            instance._state.adding = False
+            instance._state.db = db
+            post_save.send(
+                sender=model, instance=instance, created=True,
+                update_fields=None, raw=False, using=db
+            )
+        return True
+
 
 class FavoriteRecipe(models.Model):
     """
@@ -110,6 +316,14 @@ class FavoriteRecipe(models.Model):
         verbose_name='Рецепт',
     )
 
+    objects = UserRecipeQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'recipe'],
+                                    name='unique_favorite_recipe')
+        ]
+
 
 class ShoppingCart(models.Model):
     """ Модель Корзина покупок """
@@ -127,6 +341,8 @@ class ShoppingCart(models.Model):
         verbose_name='Рецепт',
     )
 
+    objects = UserRecipeQuerySet.as_manager()
+
     class Meta:
         verbose_name = 'Корзина покупок'
         verbose_name_plural = 'Корзина покупок'
@@ -137,3 +353,55 @@ class ShoppingCart(models.Model):
 
     def __str__(self):
         return f'{self.user} добавил {self.recipe} в Корзину покупок'
+
+
+class ShortLink(models.Model):
+    """Короткая ссылка на рецепт."""
+
+    recipe = models.OneToOneField(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name='short_link',
+        verbose_name='Рецепт',
+    )
+    code = models.CharField('Код', max_length=16, unique=True)
+
+    class Meta:
+        verbose_name = 'Короткая ссылка'
+        verbose_name_plural = 'Короткие ссылки'
+
+    def __str__(self):
+        return self.code
+
+
+class ImageJob(models.Model):
+    """Задача фоновой обработки загруженного изображения."""
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'В очереди'
+        PROCESSING = 'processing', 'Обрабатывается'
+        DONE = 'done', 'Готово'
+        FAILED = 'failed', 'Ошибка'
+
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveBigIntegerField()
+    content_object = GenericForeignKey('content_type', 'object_id')
+    field = models.CharField('Поле изображения', max_length=64)
+    source = models.CharField('Исходный файл', max_length=255)
+    status = models.CharField(
+        'Статус', max_length=16,
+        choices=Status.choices, default=Status.PENDING
+    )
+    error = models.TextField('Ошибка', blank=True)
+    created = models.DateTimeField('Создана', auto_now_add=True)
+    claimed_at = models.DateTimeField('Взята в обработку', null=True)
+
+    class Meta:
+        verbose_name = 'Обработка изображения'
+        verbose_name_plural = 'Обработка изображений'
+        indexes = (
+            models.Index(fields=('status', 'id'), name='image_job_queue_idx'),
+        )
+
+    def __str__(self):
+        return f'{self.content_type} {self.object_id}: {self.status}'
@@ -0,0 +1,157 @@
+import csv
+import io
+import json
+from datetime import datetime
+
+from django.conf import settings
+from rest_framework import exceptions, renderers
+from rest_framework.negotiation import DefaultContentNegotiation
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.pdfgen import canvas
+
+PDF_FONT_NAME = 'ShoppingListFont'
+PDF_FONT_SIZE = 12
+PDF_MARGIN = 50
+PDF_LINE_HEIGHT = 18
+
+
+class ShoppingListRenderer(renderers.BaseRenderer):
+    """
+    Базовый рендерер списка покупок.
+    Сам список отдаётся потоком через stream(),
+    render() нужен только для ответов с ошибками.
+    """
+
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return json.dumps(data, ensure_ascii=False).encode('utf-8')
+
+    def stream(self, user, ingredients):
+        """Генератор частей файла по строкам агрегированного запроса."""
+        raise NotImplementedError('stream() must be implemented.')
+
+    @staticmethod
+    def header(user):
+        return (
+            f'Список покупок для: {user.get_full_name()}',
+            f'Дата: {datetime.today():%Y-%m-%d}',
+        )
+
+    @staticmethod
+    def footer():
+        return f'Foodgram ({datetime.today():%Y})'
+
+    @staticmethod
+    def line(ingredient):
+        return (
+            f'- {ingredient["ingredients__name"]} '
+            f'({ingredient["ingredients__measurement_unit"]})'
+            f' - {ingredient["total_amount"]}'
+        )
+
+
+class ShoppingListTextRenderer(ShoppingListRenderer):
+    """Список покупок в виде текста."""
+
+    media_type = 'text/plain'
+    format = 'txt'
+
+    def stream(self, user, ingredients):
+        title, date = self.header(user)
+        yield f'{title}\n\n{date}\n\n'
+        for ingredient in ingredients:
+            yield self.line(ingredient) + '\n'
+        yield f'\n{self.footer()}'
+
+
+class Echo:
+    """Псевдобуфер для csv.writer, возвращающий записанную строку."""
+
+    def write(self, value):
+        return value
+
+
+class ShoppingListCSVRenderer(ShoppingListRenderer):
+    """Список покупок в формате CSV."""
+
+    media_type = 'text/csv'
+    format = 'csv'
+
+    def stream(self, user, ingredients):
+        writer = csv.writer(Echo())
+        yield writer.writerow(('name', 'measurement_unit', 'amount'))
+        for ingredient in ingredients:
+            yield writer.writerow((
+                ingredient['ingredients__name'],
+                ingredient['ingredients__measurement_unit'],
+                ingredient['total_amount'],
+            ))
+
+
+class ShoppingListPDFRenderer(ShoppingListRenderer):
+    """
+    Список покупок в формате PDF.
+    Документ собирается постранично и отдаётся частями;
+    его размер ограничен числом разных ингредиентов, а не рецептов.
+    """
+
+    media_type = 'application/pdf'
+    format = 'pdf'
+    charset = None
+    chunk_size = 64 * 1024
+
+    def stream(self, user, ingredients):
+        if PDF_FONT_NAME not in pdfmetrics.getRegisteredFontNames():
+            pdfmetrics.registerFont(
+                TTFont(PDF_FONT_NAME, settings.SHOPPING_LIST_PDF_FONT)
+            )
+        buffer = io.BytesIO()
+        pdf = canvas.Canvas(buffer, pagesize=A4)
+        width, height = A4
+        y = height - PDF_MARGIN
+
+        def write_line(text):
+            nonlocal y
+            if y < PDF_MARGIN:
+                pdf.showPage()
+                y = height - PDF_MARGIN
+            pdf.setFont(PDF_FONT_NAME, PDF_FONT_SIZE)
+            pdf.drawString(PDF_MARGIN, y, text)
+            y -= PDF_LINE_HEIGHT
+
+        for text in self.header(user):
+            write_line(text)
+        write_line('')
+        for ingredient in ingredients:
+            write_line(self.line(ingredient))
+        write_line('')
+        write_line(self.footer())
+        pdf.save()
+        buffer.seek(0)
+        while True:
+            chunk = buffer.read(self.chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+
+SHOPPING_LIST_RENDERERS = (
+    ShoppingListTextRenderer,
+    ShoppingListCSVRenderer,
+    ShoppingListPDFRenderer,
+)
+
+
+class ShoppingListNegotiation(DefaultContentNegotiation):
+    """Отдать текстовый список, если Accept не совпал ни с одним форматом."""
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        try:
+            return super().select_renderer(request, renderers, format_suffix)
+        except exceptions.NotAcceptable:
+            return renderers[0], renderers[0].media_type
@@ -0,0 +1,399 @@
+import re
+import time
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from threading import Lock
+
+from django.conf import settings
+from django.contrib.postgres.search import (
+    SearchHeadline, SearchQuery, SearchRank, SearchVector
+)
+from django.db import connections
+from django.db.models import (
+    Case, F, FloatField, IntegerField, TextField, Value, When
+)
+from django.db.models.functions import Replace
+from django.utils.html import escape
+
+from .models import Ingredients, Recipe, RecipeIngredients
+
+SEARCH_CONFIG = 'russian'
+
+
+def recipe_search_vector():
+    """Поисковый вектор рецепта: название весит больше описания."""
+    return (
+        SearchVector('name', weight='A', config=SEARCH_CONFIG)
+        + SearchVector('text', weight='B', config=SEARCH_CONFIG)
+    )
+
+
+def normalize(value):
+    """Привести строку к виду для поиска без учёта регистра."""
+    return value.casefold().replace('ё', 'е')
+
+
+class IngredientIndex:
+    """
+    Индекс ингредиентов в памяти процесса для автодополнения.
+    Хранит отсортированный массив нормализованных названий:
+    совпадения по префиксу ищутся бинарным поиском,
+    совпадения по подстроке добираются полным проходом
+    только если префиксных не хватило до лимита.
+    """
+
+    def __init__(self, ttl=None):
+        self.ttl = ttl
+        self._lock = Lock()
+        self._keys = None
+        self._rows = None
+        self._built_at = None
+
+    def invalidate(self):
+        with self._lock:
+            self._keys = None
+            self._rows = None
+
+    def _build(self):
+        rows = sorted(
+            (normalize(name), id, name, measurement_unit)
+            for id, name, measurement_unit in Ingredients.objects.values_list(
+                'id', 'name', 'measurement_unit'
+            )
+        )
+        self._keys = [row[0] for row in rows]
+        self._rows = rows
+        self._built_at = time.monotonic()
+
+    def _is_stale(self):
+        if self._keys is None:
+            return True
+        return (
+            self.ttl is not None
+            and time.monotonic() - self._built_at > self.ttl
+        )
+
+    def _ensure_built(self):
+        """Построенный индекс; ссылки берутся под блокировкой,
+        чтобы параллельный invalidate() не подменил их на None."""
+        with self._lock:
+            if self._is_stale():
+                self._build()
+            return self._keys, self._rows
+
+    def search(self, query, limit):
+        """Найти ингредиенты: сначала по префиксу, затем по подстроке."""
+        keys, rows = self._ensure_built()
+        query = normalize(query.strip())
+        if not query:
+            return []
+        result = []
+        position = bisect_left(keys, query)
+        while (
+            position < len(keys) and len(result) < limit
+            and keys[position].startswith(query)
+        ):
+            result.append(rows[position])
+            position += 1
+        if len(result) < limit:
+            for row in rows:
+                if query in row[0] and not row[0].startswith(query):
+                    result.append(row)
+                    if len(result) == limit:
+                        break
+        return [
+            {'id': id, 'name': name, 'measurement_unit': measurement_unit}
+            for _, id, name, measurement_unit in result
+        ]
+
+
+ingredient_index = IngredientIndex(ttl=settings.INGREDIENT_INDEX_TTL)
+
+
+def tokenize(text):
+    return re.findall(r'\w+', normalize(text))
+
+
+class RecipeSearchIndex:
+    """
+    Инвертированный индекс рецептов в памяти процесса.
+    Используется вместо tsvector, когда база не PostgreSQL:
+    термы запроса сопоставляются с началом слов бинарным поиском,
+    совпадения в названии весят больше, чем в описании.
+    """
+
+    name_weight = 2
+    text_weight = 1
+    snippet_length = 120
+
+    def __init__(self, ttl=None):
+        self.ttl = ttl
+        self._lock = Lock()
+        self._tokens = None
+        self._postings = None
+        self._texts = None
+        self._built_at = None
+
+    def invalidate(self):
+        with self._lock:
+            self._tokens = None
+
+    def _build(self):
+        postings = defaultdict(Counter)
+        texts = {}
+        for id, name, text in Recipe.objects.values_list(
+            'id', 'name', 'text'
+        ):
+            for token in tokenize(name):
+                postings[token][id] += self.name_weight
+            for token in tokenize(text):
+                postings[token][id] += self.text_weight
+            texts[id] = text
+        self._postings = postings
+        self._texts = texts
+        self._tokens = sorted(postings)
+        self._built_at = time.monotonic()
+
+    def _is_stale(self):
+        if self._tokens is None:
+            return True
+        return (
+            self.ttl is not None
+            and time.monotonic() - self._built_at > self.ttl
+        )
+
+    def _ensure_built(self):
+        with self._lock:
+            if self._is_stale():
+                self._build()
+            return self._tokens, self._postings, self._texts
+
+    def _match(self, tokens, postings, term):
+        scores = Counter()
+        position = bisect_left(tokens, term)
+        while position < len(tokens) and tokens[position].startswith(term):
+            scores.update(postings[tokens[position]])
+            position += 1
+        return scores
+
+    def search(self, query, limit):
+        """Рецепты со всеми термами запроса: [(id, ранг, фрагмент)]."""
+        tokens, postings, texts = self._ensure_built()
+        terms = tokenize(query)
+        if not terms:
+            return []
+        scores = self._match(tokens, postings, terms[0])
+        for term in terms[1:]:
+            matched = self._match(tokens, postings, term)
+            scores = Counter({
+                id: score + matched[id]
+                for id, score in scores.items() if id in matched
+            })
+        return [
+            (id, score, self.snippet(texts[id], terms))
+            for id, score in scores.most_common(limit)
+        ]
+
+    def snippet(self, text, terms):
+        """
+        Фрагмент описания вокруг первого совпадения с выделением.
+        Текст экранируется, разметкой остаются только теги <b>.
+        """
+        pattern = re.compile(
+            r'\b(?:' + '|'.join(map(re.escape, terms)) + r')\w*'
+        )
+        normalized = normalize(text)
+        if len(normalized) != len(text):
+            normalized, text = text.lower(), text
+        first = pattern.search(normalized)
+        start = max(0, first.start() - self.snippet_length // 2) if first else 0
+        end = start + self.snippet_length
+        parts, position = [], start
+        for found in pattern.finditer(normalized, start, end):
+            parts.append(escape(text[position:found.start()]))
+            parts.append(f'<b>{escape(text[found.start():found.end()])}</b>')
+            position = found.end()
+        parts.append(escape(text[position:end]))
+        return ''.join(parts)
+
+
+recipe_search_index = RecipeSearchIndex(ttl=settings.RECIPE_SEARCH_INDEX_TTL)
+
+# Замены django.utils.html.escape; & заменяется первым.
+HTML_ESCAPES = (
+    ('&', '&amp;'), ('<', '&lt;'), ('>', '&gt;'),
+    ('"', '&quot;'), ("'", '&#x27;'),
+)
+
+
+def escaped_text():
+    """Описание рецепта, экранированное для HTML на стороне базы."""
+    expression = F('text')
+    for char, entity in HTML_ESCAPES:
+        expression = Replace(expression, Value(char), Value(entity))
+    return expression
+
+
+def search_recipes(queryset, query):
+    """
+    Полнотекстовый поиск с ранжированием и фрагментами.
+    В PostgreSQL используется tsvector с GIN-индексом,
+    в остальных базах — индекс в памяти процесса.
+    """
+    if connections[queryset.db].vendor == 'postgresql':
+        search_query = SearchQuery(
+            query, config=SEARCH_CONFIG, search_type='websearch'
+        )
+        return queryset.filter(search_vector=search_query).annotate(
+            search_rank=SearchRank(F('search_vector'), search_query),
+            search_snippet=SearchHeadline(
+                escaped_text(), search_query, config=SEARCH_CONFIG,
+                start_sel='<b>', stop_sel='</b>'
+            ),
+        ).order_by('-search_rank', '-id')
+    matches = recipe_search_index.search(
+        query, settings.RECIPE_SEARCH_LIMIT
+    )
+    if not matches:
+        return queryset.none()
+    return queryset.filter(id__in=[id for id, _, _ in matches]).annotate(
+        search_rank=Case(
+            *(When(id=id, then=Value(rank)) for id, rank, _ in matches),
+            output_field=FloatField()
+        ),
+        search_snippet=Case(
+            *(When(id=id, then=Value(snippet)) for id, _, snippet in matches),
+            output_field=TextField()
+        ),
+    ).order_by('-search_rank', '-id')
+
+
+class RecipeCoverageIndex:
+    """
+    Битовые маски состава рецептов в памяти процесса.
+    Каждому ингредиенту выдаётся свой бит, рецепт хранится
+    одним целым числом: число совпадений с набором пользователя —
+    количество единиц в пересечении масок.
+    После записи рецепта обновляется только его маска; словарь
+    масок при этом копируется, чтобы rank() мог обходить свой
+    снимок без блокировки.
+    """
+
+    def __init__(self, ttl=None):
+        self.ttl = ttl
+        self._lock = Lock()
+        self._bits = {}
+        self._masks = None
+        self._built_at = None
+
+    def invalidate(self):
+        with self._lock:
+            self._masks = None
+
+    def _bit(self, ingredient_id):
+        bit = self._bits.get(ingredient_id)
+        if bit is None:
+            bit = self._bits[ingredient_id] = 1 << len(self._bits)
+        return bit
+
+    def _build(self):
+        masks = defaultdict(int)
+        for recipe_id, ingredient_id in RecipeIngredients.objects.values_list(
+            'recipe_id', 'ingredients_id'
+        ).order_by():
+            masks[recipe_id] |= self._bit(ingredient_id)
+        self._masks = dict(masks)
+        self._built_at = time.monotonic()
+
+    def _is_stale(self):
+        if self._masks is None:
+            return True
+        return (
+            self.ttl is not None
+            and time.monotonic() - self._built_at > self.ttl
+        )
+
+    def _ensure_built(self):
+        with self._lock:
+            if self._is_stale():
+                self._build()
+            return self._masks
+
+    def refresh(self, recipe_id):
+        """Перечитать состав одного рецепта, если индекс уже построен."""
+        if self._masks is None:
+            return
+        ingredient_ids = RecipeIngredients.objects.filter(
+            recipe_id=recipe_id
+        ).values_list('ingredients_id', flat=True)
+        with self._lock:
+            if self._masks is None:
+                return
+            mask = 0
+            for ingredient_id in ingredient_ids:
+                mask |= self._bit(ingredient_id)
+            masks = dict(self._masks)
+            if mask:
+                masks[recipe_id] = mask
+            else:
+                masks.pop(recipe_id, None)
+            self._masks = masks
+
+    def discard(self, recipe_id):
+        with self._lock:
+            if self._masks is not None:
+                masks = dict(self._masks)
+                masks.pop(recipe_id, None)
+                self._masks = masks
+
+    def rank(self, ingredient_ids, limit):
+        """Рецепты по покрытию набора: [(id, совпало, не хватает)]."""
+        masks = self._ensure_built()
+        have = 0
+        for ingredient_id in ingredient_ids:
+            have |= self._bits.get(ingredient_id, 0)
+        if not have:
+            return []
+        ranked = []
+        for recipe_id, mask in masks.items():
+            matched = mask & have
+            if matched:
+                matched = bin(matched).count('1')
+                ranked.append((
+                    -matched, bin(mask).count('1') - matched, -recipe_id
+                ))
+        ranked.sort()
+        return [
+            (-recipe_id, -matched, missing)
+            for matched, missing, recipe_id in ranked[:limit]
+        ]
+
+
+recipe_coverage_index = RecipeCoverageIndex(
+    ttl=settings.RECIPE_COVERAGE_INDEX_TTL
+)
+
+
+def coverage_recipes(queryset, ingredient_ids):
+    """
+    Рецепты, ранжированные по доле имеющихся ингредиентов.
+    По умолчанию считает база, с RECIPE_COVERAGE_INDEX —
+    битовый индекс в памяти процесса.
+    """
+    if not settings.RECIPE_COVERAGE_INDEX:
+        return queryset.by_coverage(ingredient_ids)
+    ranked = recipe_coverage_index.rank(
+        ingredient_ids, settings.RECIPE_SEARCH_LIMIT
+    )
+    if not ranked:
+        return queryset.none()
+    return queryset.filter(id__in=[id for id, _, _ in ranked]).annotate(
+        matched_ingredients=Case(
+            *(When(id=id, then=Value(matched)) for id, matched, _ in ranked),
+            output_field=IntegerField()
+        ),
+        missing_ingredients=Case(
+            *(When(id=id, then=Value(missing)) for id, _, missing in ranked),
+            output_field=IntegerField()
+        ),
+    ).order_by('-matched_ingredients', 'missing_ingredients', '-id')
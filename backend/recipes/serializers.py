@@ -1,9 +1,13 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
-from django.db.models import F
-
-from .models import Recipe, Tag, Ingredients, RecipeIngredients
-from users.serializers import UserListSerializer, Base64ImageField
+from django.db import transaction
+
+from .models import (
+    Recipe, Tag, Ingredients, RecipeIngredients, RecipeTags
+)
+from users.serializers import (
+    UserListSerializer, Base64ImageField, ThumbnailField
+)
 from .exceptions import CustomAPIException
 
 
@@ -36,6 +40,7 @@ class RecipeSerializer(serializers.ModelSerializer):
     author = UserListSerializer(read_only=True)
     ingredients = serializers.SerializerMethodField()
     image = Base64ImageField()
+    thumbnail = ThumbnailField(fallback='image')
     is_favorited = serializers.SerializerMethodField(read_only=True)
     is_in_shopping_cart = serializers.SerializerMethodField(read_only=True)
 
@@ -50,27 +55,48 @@ class RecipeSerializer(serializers.ModelSerializer):
             'is_in_shopping_cart',
             'name',
             'image',
+            'thumbnail',
+            'image_status',
             'text',
             'cooking_time',
         )
 
+    def to_representation(self, instance):
+        if hasattr(instance, 'author_is_subscribed'):
+            instance.author.is_subscribed = instance.author_is_subscribed
+        data = super().to_representation(instance)
+        if hasattr(instance, 'search_snippet'):
+            data['snippet'] = instance.search_snippet
+        if hasattr(instance, 'matched_ingredients'):
+            data['matched_ingredients'] = instance.matched_ingredients
+            data['missing_ingredients'] = instance.missing_ingredients
+        return data
+
     def get_ingredients(self, obj):
-        recipe = obj
-        ingredients = recipe.ingredients.values(
-            'id',
-            'name',
-            'measurement_unit',
-            amount=F('recipeingredients__amount')
-        )
-        return ingredients
+        amounts = getattr(obj, 'ingredient_amounts', None)
+        if amounts is None:
+            amounts = obj.recipeingredients_set.select_related('ingredients')
+        return [
+            {
+                'id': item.ingredients.id,
+                'name': item.ingredients.name,
+                'measurement_unit': item.ingredients.measurement_unit,
+                'amount': item.amount,
+            }
+            for item in amounts
+        ]
 
     def get_is_favorited(self, obj):
+        if hasattr(obj, 'is_favorited'):
+            return obj.is_favorited
         user = self.context['request'].user
         if user.is_anonymous:
             return False
         return user.favorite_recipes.filter(recipe=obj).exists()
 
     def get_is_in_shopping_cart(self, obj):
+        if hasattr(obj, 'is_in_shopping_cart'):
+            return obj.is_in_shopping_cart
         user = self.context['request'].user
         if user.is_anonymous:
             return False
@@ -120,17 +146,21 @@ class RecipeWriteSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError({
                 'ingredients': 'Нужен хотя бы один ингредиент!'
             })
-        ingredients_set = set()
-        for item in ingredients:
-            try:
-                ingredient = Ingredients.objects.get(id=item['id'])
-            except Ingredients.DoesNotExist:
-                raise serializers.ValidationError()
-            if ingredient in ingredients_set:
-                raise serializers.ValidationError({
-                    'ingredients': 'Ингридиенты не могут повторяться!'
-                })
-            ingredients_set.add(ingredient)
+        ids = [item['id'] for item in ingredients]
+        if len(ids) != len(set(ids)):
+            raise serializers.ValidationError({
+                'ingredients': 'Ингридиенты не могут повторяться!'
+            })
+        existing = set(
+            Ingredients.objects.filter(id__in=ids).values_list(
+                'id', flat=True
+            )
+        )
+        missing = [id for id in ids if id not in existing]
+        if missing:
+            raise serializers.ValidationError({
+                'ingredients': f'Ингредиенты не найдены: {missing}'
+            })
         return value
 
     def validate_tags(self, value):
@@ -151,12 +181,62 @@ class RecipeWriteSerializer(serializers.ModelSerializer):
     def create_ingredients_amounts(self, ingredients, recipe):
         RecipeIngredients.objects.bulk_create(
             [RecipeIngredients(
-                ingredients=Ingredients.objects.get(id=ingredient['id']),
+                ingredients_id=ingredient['id'],
                 recipe=recipe,
                 amount=ingredient['amount']
             ) for ingredient in ingredients]
         )
 
+    def update_tags(self, recipe, tags):
+        """Удалить снятые и добавить новые тэги, не трогая остальные."""
+        current = set(
+            RecipeTags.objects.filter(recipe=recipe).values_list(
+                'tags_id', flat=True
+            )
+        )
+        submitted = {tag.id for tag in tags}
+        removed = current - submitted
+        if removed:
+            RecipeTags.objects.filter(
+                recipe=recipe, tags_id__in=removed
+            ).delete()
+        added = submitted - current
+        if added:
+            RecipeTags.objects.bulk_create(
+                [RecipeTags(recipe=recipe, tags_id=id) for id in added]
+            )
+
+    def update_ingredients_amounts(self, recipe, ingredients):
+        """
+        Сравнить ингредиенты рецепта с присланными:
+        удалить лишние, обновить изменившиеся количества, добавить новые.
+        """
+        current = {
+            item.ingredients_id: item
+            for item in RecipeIngredients.objects.filter(recipe=recipe)
+        }
+        submitted = {item['id']: item['amount'] for item in ingredients}
+        removed = current.keys() - submitted.keys()
+        if removed:
+            RecipeIngredients.objects.filter(
+                recipe=recipe, ingredients_id__in=removed
+            ).delete()
+        changed = []
+        for id, amount in submitted.items():
+            item = current.get(id)
+            if item is not None and item.amount != amount:
+                item.amount = amount
+                changed.append(item)
+        if changed:
+            RecipeIngredients.objects.bulk_update(changed, ('amount',))
+        added = [
+            {'id': id, 'amount': amount}
+            for id, amount in submitted.items() if id not in current
+        ]
+        if added:
+            self.create_ingredients_amounts(added, recipe)
+
+    @transaction.atomic
     def create(self, validated_data):
         tags = validated_data.pop('tags')
         ingredients = validated_data.pop('ingredients')
@@ -165,6 +245,7 @@ class RecipeWriteSerializer(serializers.ModelSerializer):
         self.create_ingredients_amounts(recipe=recipe, ingredients=ingredients)
         return recipe
 
+    @transaction.atomic
     def update(self, instance, validated_data):
         request = self.context.get('request')
         if request.user != instance.author:
@@ -177,23 +258,21 @@ class RecipeWriteSerializer(serializers.ModelSerializer):
         tags = validated_data.pop('tags')
         ingredients = validated_data.pop('ingredients')
         instance = super().update(instance, validated_data)
-        instance.tags.clear()
-        instance.tags.set(tags)
-        instance.ingredients.clear()
-        self.create_ingredients_amounts(
-            recipe=instance, ingredients=ingredients
-        )
-        instance.save()
+        self.update_tags(instance, tags)
+        self.update_ingredients_amounts(instance, ingredients)
         return instance
 
     def to_representation(self, instance):
         request = self.context.get('request')
         context = {'request': request}
+        instance = Recipe.objects.with_related().with_user_flags(
+            request.user
+        ).get(pk=instance.pk)
         return RecipeSerializer(instance, context=context).data
 
 
 class RecipeShortSerializer(serializers.ModelSerializer):
-    image = Base64ImageField()
+    image = ThumbnailField(source='thumbnail', fallback='image')
 
     class Meta:
         model = Recipe
@@ -0,0 +1,53 @@
+import string
+from functools import lru_cache
+
+from django.conf import settings
+from rest_framework.generics import get_object_or_404
+
+from foodgram_backend.async_api import in_pool
+
+from .models import Recipe, ShortLink
+
+BASE62_ALPHABET = string.digits + string.ascii_letters
+
+
+def encode_base62(number):
+    """Перевести неотрицательное число в строку base62."""
+    if number == 0:
+        return BASE62_ALPHABET[0]
+    code = []
+    while number:
+        number, remainder = divmod(number, len(BASE62_ALPHABET))
+        code.append(BASE62_ALPHABET[remainder])
+    return ''.join(reversed(code))
+
+
+@lru_cache(maxsize=settings.SHORT_LINK_CACHE_SIZE)
+def get_short_code(recipe_id):
+    """
+    Вернуть код короткой ссылки рецепта.
+    Код создаётся при первом обращении, повторные вызовы
+    обслуживаются из кеша процесса без обращения к БД.
+    Кеш сбрасывается при удалении рецепта (signals.py); другие
+    воркеры сохраняют код до перезапуска, но страница удалённого
+    рецепта всё равно ответит 404, а id рецептов не переиспользуются.
+    """
+    recipe = get_object_or_404(Recipe, id=recipe_id)
+    link, _ = ShortLink.objects.get_or_create(
+        recipe=recipe,
+        defaults={
+            'code': encode_base62(recipe.id + settings.SHORT_LINK_SALT)
+        }
+    )
+    return link.code
+
+
+@lru_cache(maxsize=settings.SHORT_LINK_CACHE_SIZE)
+def get_recipe_id(code):
+    """Найти id рецепта по коду короткой ссылки."""
+    return get_object_or_404(ShortLink, code=code).recipe_id
+
+
+async def aget_recipe_id(code):
+    """get_recipe_id для async-views: поиск выполняется в пуле потоков."""
+    return await in_pool(get_recipe_id)(code)
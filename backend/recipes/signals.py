@@ -0,0 +1,184 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connections, transaction
+from django.db.models.signals import (
+    post_delete, post_init, post_save, pre_save
+)
+from django.dispatch import receiver
+
+from foodgram_backend.images import pop_pending_image, prepare_image
+from .cache import invalidate
+from .counters import change_counter
+from .image_jobs import enqueue
+from .models import (
+    FavoriteRecipe, Ingredients, Recipe, RecipeIngredients, RecipeTags,
+    ShoppingCart, Tag
+)
+from .shortlinks import get_recipe_id, get_short_code
+from .search import (
+    ingredient_index, recipe_coverage_index, recipe_search_index,
+    recipe_search_vector
+)
+
+User = get_user_model()
+
+CACHE_DEPENDENCIES = {
+    Tag: ('tags', 'recipes'),
+    Ingredients: ('ingredients', 'recipes'),
+    Recipe: ('recipes',),
+    RecipeIngredients: ('recipes',),
+    RecipeTags: ('recipes',),
+}
+
+# Поля пользователя, которые попадают в ответы с рецептами (автор).
+AUTHOR_FIELDS = (
+    'email', 'username', 'first_name', 'last_name',
+    'avatar', 'avatar_thumbnail', 'avatar_status',
+)
+
+RECIPE_COUNTERS = {
+    FavoriteRecipe: 'favorites_count',
+    ShoppingCart: 'in_carts_count',
+}
+
+
+@receiver((post_save, post_delete), sender=Ingredients)
+def invalidate_ingredient_index(sender, **kwargs):
+    """Сбросить индекс автодополнения при изменении ингредиентов."""
+    ingredient_index.invalidate()
+
+
+@receiver(post_save, sender=Recipe)
+def update_search_vector(sender, instance, using, **kwargs):
+    if connections[using].vendor == 'postgresql':
+        Recipe.objects.using(using).filter(pk=instance.pk).update(
+            search_vector=recipe_search_vector()
+        )
+
+
+@receiver((post_save, post_delete), sender=Recipe)
+def invalidate_recipe_search_index(sender, **kwargs):
+    recipe_search_index.invalidate()
+
+
+@receiver(post_save, sender=Recipe)
+@receiver((post_save, post_delete), sender=RecipeIngredients)
+def refresh_recipe_coverage(sender, instance, **kwargs):
+    """
+    Обновить маску рецепта после коммита: сериализатор пишет
+    состав массовыми операциями уже после сохранения рецепта.
+    """
+    recipe_id = instance.pk if sender is Recipe else instance.recipe_id
+    transaction.on_commit(lambda: recipe_coverage_index.refresh(recipe_id))
+
+
+@receiver(post_delete, sender=Recipe)
+def discard_recipe_coverage(sender, instance, **kwargs):
+    recipe_coverage_index.discard(instance.pk)
+
+
+@receiver(post_delete, sender=Recipe)
+def clear_short_link_cache(sender, **kwargs):
+    """
+    Код удалённого рецепта не должен находиться в кеше процесса.
+    lru_cache не удаляет отдельные ключи, поэтому кеш сбрасывается
+    целиком; удаление рецептов редкое, коды строятся заново по запросу.
+    """
+    get_short_code.cache_clear()
+    get_recipe_id.cache_clear()
+
+
+@receiver(pre_save, sender=Recipe)
+def prepare_recipe_image(sender, instance, **kwargs):
+    prepare_image(
+        instance, 'image', 'thumbnail', 'image_status',
+        settings.RECIPE_THUMBNAIL_SIZE
+    )
+
+
+@receiver(post_save, sender=Recipe)
+def enqueue_recipe_image(sender, instance, **kwargs):
+    if pop_pending_image(instance, 'image'):
+        enqueue(instance, 'image')
+
+
+@receiver(post_save, sender=FavoriteRecipe)
+@receiver(post_save, sender=ShoppingCart)
+def increment_recipe_counter(sender, instance, created, **kwargs):
+    if created:
+        change_counter(
+            Recipe.objects.filter(pk=instance.recipe_id),
+            RECIPE_COUNTERS[sender], 1
+        )
+
+
+@receiver(post_delete, sender=FavoriteRecipe)
+@receiver(post_delete, sender=ShoppingCart)
+def decrement_recipe_counter(sender, instance, **kwargs):
+    change_counter(
+        Recipe.objects.filter(pk=instance.recipe_id),
+        RECIPE_COUNTERS[sender], -1
+    )
+
+
+@receiver(post_save, sender=Recipe)
+def increment_recipes_count(sender, instance, created, **kwargs):
+    if created:
+        change_counter(
+            User.objects.filter(pk=instance.author_id), 'recipes_count', 1
+        )
+
+
+@receiver(post_delete, sender=Recipe)
+def decrement_recipes_count(sender, instance, **kwargs):
+    change_counter(
+        User.objects.filter(pk=instance.author_id), 'recipes_count', -1
+    )
+
+
+def author_fields(instance):
+    deferred = instance.get_deferred_fields()
+    return tuple(
+        None if name in deferred else str(getattr(instance, name))
+        for name in AUTHOR_FIELDS
+    )
+
+
+@receiver(post_init, sender=User)
+def remember_author_fields(sender, instance, **kwargs):
+    instance._author_fields = author_fields(instance)
+
+
+@receiver(post_save, sender=User)
+def invalidate_author_cache(sender, instance, created, update_fields,
+                            **kwargs):
+    """
+    Сбросить кеш рецептов, только если изменились данные автора.
+    Вход (last_login), смена пароля и прочие сохранения
+    пользователя кеш не трогают.
+    """
+    if (
+        update_fields is not None
+        and not set(update_fields) & set(AUTHOR_FIELDS)
+    ):
+        return
+    fields = author_fields(instance)
+    changed = fields != instance._author_fields
+    instance._author_fields = fields
+    if changed and not created:
+        invalidate('recipes')
+
+
+@receiver(post_delete, sender=User)
+def invalidate_deleted_author_cache(sender, **kwargs):
+    invalidate('recipes')
+
+
+def invalidate_response_cache(sender, **kwargs):
+    """Сбросить кеш ответов, в которые попадают данные модели."""
+    invalidate(*CACHE_DEPENDENCIES[sender])
+
+
+for model in CACHE_DEPENDENCIES:
+    post_save.connect(invalidate_response_cache, sender=model)
+    post_delete.connect(invalidate_response_cache, sender=model)
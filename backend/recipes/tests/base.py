@@ -0,0 +1,110 @@
+from django.contrib.auth import get_user_model
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+from rest_framework.test import APITestCase, APITransactionTestCase
+
+from foodgram_backend.routers import REPLICA
+
+from recipes.models import (
+    FavoriteRecipe, Ingredients, Recipe, RecipeIngredients, ShoppingCart, Tag
+)
+from users.models import Follow
+
+User = get_user_model()
+
+IMAGE = (
+    'data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAIAAACQd1Pe'
+    'AAAADElEQVR4nGP4z8AAAAMBAQDJ/pLvAAAAAElFTkSuQmCC'
+)
+
+
+class FoodgramDataMixin:
+    """Общие данные тестов: пользователь, автор, тэги и ингредиенты."""
+
+    @classmethod
+    def create_test_data(cls):
+        cls.user = User.objects.create_user(
+            username='user', email='user@example.com', password='password',
+            first_name='Иван', last_name='Иванов'
+        )
+        cls.author = User.objects.create_user(
+            username='author', email='author@example.com',
+            password='password', first_name='Пётр', last_name='Петров'
+        )
+        cls.tags = [
+            Tag.objects.create(name=f'Тэг {index}', slug=f'tag-{index}')
+            for index in range(2)
+        ]
+        cls.ingredients = [
+            Ingredients.objects.create(
+                name=f'Ингредиент {index}', measurement_unit='г'
+            )
+            for index in range(5)
+        ]
+
+    def clear_cache(self):
+        caches[settings.API_CACHE_ALIAS].clear()
+
+    def create_recipes(self, count, author=None, **fields):
+        """Рецепты с тэгами, ингредиентами, избранным и корзиной."""
+        recipes = []
+        for index in range(count):
+            recipe = Recipe.objects.create(
+                author=author or self.author, name=f'Рецепт {index}',
+                text='Описание', cooking_time=index + 1,
+                image='recipes/images/recipe.png', **fields
+            )
+            recipe.tags.set(self.tags)
+            RecipeIngredients.objects.bulk_create(
+                RecipeIngredients(
+                    recipe=recipe, ingredients=ingredient, amount=10
+                ) for ingredient in self.ingredients
+            )
+            FavoriteRecipe.objects.create(user=self.user, recipe=recipe)
+            ShoppingCart.objects.create(user=self.user, recipe=recipe)
+            recipes.append(recipe)
+        return recipes
+
+    @staticmethod
+    def follow(user, author):
+        return Follow.objects.create(user=user, following=author)
+
+
+class FoodgramTestCase(FoodgramDataMixin, APITestCase):
+    """Данные создаются один раз, тесты откатываются транзакцией."""
+
+    databases = {'default', REPLICA}
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # Реплика использует соединение default: отдельное соединение
+        # не увидело бы данные незавершённой транзакции теста.
+        cls.replica_connection = connections[REPLICA]
+        connections[REPLICA] = connections['default']
+
+    @classmethod
+    def tearDownClass(cls):
+        connections[REPLICA] = cls.replica_connection
+        super().tearDownClass()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.create_test_data()
+
+    def setUp(self):
+        self.clear_cache()
+
+
+class FoodgramTransactionTestCase(FoodgramDataMixin, APITransactionTestCase):
+    """
+    Те же данные с настоящими коммитами: их видят соединения
+    потоков пула, в которых async-views обращаются к базе.
+    """
+
+    databases = {'default', REPLICA}
+
+    def setUp(self):
+        self.create_test_data()
+        self.clear_cache()
@@ -0,0 +1,100 @@
+from asyncio import iscoroutinefunction
+
+from django.test import AsyncClient, SimpleTestCase, override_settings
+from django.urls import resolve
+from rest_framework.authtoken.models import Token
+
+from recipes.tests.base import IMAGE, FoodgramTransactionTestCase
+
+
+@override_settings(ROOT_URLCONF='foodgram_backend.asgi_urls')
+class AsyncViewsTest(FoodgramTransactionTestCase):
+    """Асинхронные обработчики режима ASGI."""
+
+    def setUp(self):
+        super().setUp()
+        self.recipe = self.create_recipes(1)[0]
+        self.token = Token.objects.create(user=self.user)
+        self.client = AsyncClient()
+        self.auth = {'authorization': f'Token {self.token.key}'}
+
+    async def test_short_link(self):
+        response = await self.client.get(
+            f'/api/recipes/{self.recipe.id}/get-link/'
+        )
+        self.assertEqual(response.status_code, 200)
+        link = response.json()['short-link']
+        response = await self.client.get(link)
+        self.assertRedirects(
+            response, f'/recipes/{self.recipe.id}',
+            fetch_redirect_response=False
+        )
+        response = await self.client.get('/api/recipes/0/get-link/')
+        self.assertEqual(response.status_code, 404)
+
+    async def test_shopping_list(self):
+        response = await self.client.get(
+            '/api/recipes/download_shopping_cart/', **self.auth
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(
+            '- Ингредиент 0 (г) - 10',
+            b''.join(response.streaming_content).decode()
+        )
+        response = await self.client.get(
+            '/api/recipes/download_shopping_cart/?format=csv', **self.auth
+        )
+        self.assertTrue(response['Content-Type'].startswith('text/csv'))
+
+    async def test_shopping_list_requires_token(self):
+        response = await self.client.get(
+            '/api/recipes/download_shopping_cart/'
+        )
+        self.assertEqual(response.status_code, 401)
+        response = await self.client.get(
+            '/api/recipes/download_shopping_cart/',
+            authorization='Token wrong'
+        )
+        self.assertEqual(response.status_code, 401)
+
+    async def test_avatar(self):
+        response = await self.client.put(
+            '/api/users/me/avatar/', {'avatar': IMAGE},
+            content_type='application/json', **self.auth
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('avatar', response.json())
+        response = await self.client.put(
+            '/api/users/me/avatar/', {'avatar': 'not an image'},
+            content_type='application/json', **self.auth
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('avatar', response.json())
+        response = await self.client.delete(
+            '/api/users/me/avatar/', **self.auth
+        )
+        self.assertEqual(response.status_code, 204)
+        response = await self.client.delete(
+            '/api/users/me/avatar/', **self.auth
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+class ServerModeUrlsTest(SimpleTestCase):
+    """Асинхронные обработчики подключаются только в режиме ASGI."""
+
+    paths = (
+        '/api/recipes/download_shopping_cart/', '/api/recipes/1/get-link/',
+        '/api/users/me/avatar/', '/s/abc/',
+    )
+
+    def test_wsgi(self):
+        for path in self.paths:
+            with self.subTest(path=path):
+                self.assertFalse(iscoroutinefunction(resolve(path).func))
+
+    @override_settings(ROOT_URLCONF='foodgram_backend.asgi_urls')
+    def test_asgi(self):
+        for path in self.paths:
+            with self.subTest(path=path):
+                self.assertTrue(iscoroutinefunction(resolve(path).func))
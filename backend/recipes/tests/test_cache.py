@@ -0,0 +1,53 @@
+from recipes.cache import etag_matches, get_version
+from recipes.tests.base import FoodgramTestCase
+
+
+class ETagTest(FoodgramTestCase):
+
+    def test_etag_matches(self):
+        etag = '"abc"'
+        self.assertTrue(etag_matches(etag, '"abc"'))
+        self.assertTrue(etag_matches(etag, '"x", W/"abc"'))
+        self.assertTrue(etag_matches(etag, '*'))
+        self.assertFalse(etag_matches(etag, '"xabcx"'))
+        self.assertFalse(etag_matches(etag, '"ab"'))
+        self.assertFalse(etag_matches(etag, None))
+
+    def test_not_modified(self):
+        self.create_recipes(1)
+        etag = self.client.get('/api/recipes/')['ETag']
+        response = self.client.get('/api/recipes/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        response = self.client.get(
+            '/api/recipes/', HTTP_IF_NONE_MATCH=f'"x{etag[1:]}'
+        )
+        self.assertEqual(response.status_code, 200)
+
+
+class AuthorCacheInvalidationTest(FoodgramTestCase):
+    """Кеш рецептов сбрасывается только при изменении данных автора."""
+
+    def cached_author(self):
+        return self.client.get('/api/recipes/').data['results'][0]['author']
+
+    def test_author_changes(self):
+        self.create_recipes(1)
+        self.cached_author()
+        author = type(self.author).objects.get(pk=self.author.pk)
+        author.set_password('another-password')
+        with self.captureOnCommitCallbacks(execute=True):
+            author.save()
+            author.save(update_fields=('last_login',))
+        with self.assertNumQueries(0):
+            self.cached_author()
+        author.first_name = 'Сидор'
+        with self.captureOnCommitCallbacks(execute=True):
+            author.save()
+        self.assertEqual(self.cached_author()['first_name'], 'Сидор')
+
+    def test_version_changes_after_commit(self):
+        version = get_version('recipes')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_recipes(1)
+            self.assertEqual(get_version('recipes'), version)
+        self.assertGreater(get_version('recipes'), version)
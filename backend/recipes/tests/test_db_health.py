@@ -0,0 +1,54 @@
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from foodgram_backend import db
+
+
+class FakeConnection:
+    settings_dict = {'CONN_MAX_AGE': 60}
+    in_atomic_block = False
+
+    def __init__(self, usable=True):
+        self.connection = object()
+        self.usable = usable
+        self.checks = 0
+
+    def is_usable(self):
+        self.checks += 1
+        return self.usable
+
+    def close(self):
+        self.connection = None
+
+
+@override_settings(CONN_HEALTH_CHECK_INTERVAL=10)
+class ConnectionHealthCheckTest(SimpleTestCase):
+
+    def check(self, connection, now):
+        with mock.patch.object(db, 'connections') as connections, \
+                mock.patch.object(db, 'monotonic', return_value=now):
+            connections.all.return_value = [connection]
+            db.check_connections()
+
+    def test_checked_once_per_interval(self):
+        connection = FakeConnection()
+        self.check(connection, 100)
+        self.check(connection, 105)
+        self.assertEqual(connection.checks, 1)
+        self.check(connection, 111)
+        self.assertEqual(connection.checks, 2)
+
+    def test_broken_connection_closed(self):
+        connection = FakeConnection(usable=False)
+        self.check(connection, 100)
+        self.assertIsNone(connection.connection)
+
+    def test_skips_unopened_and_atomic(self):
+        connection = FakeConnection()
+        connection.in_atomic_block = True
+        self.check(connection, 100)
+        connection.in_atomic_block = False
+        connection.connection = None
+        self.check(connection, 100)
+        self.assertEqual(connection.checks, 0)
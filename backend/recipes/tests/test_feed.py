@@ -0,0 +1,59 @@
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from recipes.models import Recipe
+from recipes.tests.base import FoodgramTestCase
+
+User = get_user_model()
+
+PAGE_SIZE = 100
+
+
+class FeedTest(FoodgramTestCase):
+    """Лента подписок листается до конца без повторов."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        other = User.objects.create_user(
+            username='other', email='other@example.com', password='password'
+        )
+        stranger = User.objects.create_user(
+            username='stranger', email='stranger@example.com',
+            password='password'
+        )
+        Recipe.objects.bulk_create(
+            Recipe(
+                author=author, name=f'Рецепт {index}', text='Описание',
+                cooking_time=1, image='recipes/images/recipe.png'
+            )
+            for author in (cls.author, other, stranger)
+            for index in range(600)
+        )
+        # Время публикации как после миграции 0016: одно на все рецепты.
+        Recipe.objects.update(created=timezone.now())
+        cls.follow(cls.user, cls.author)
+        cls.follow(cls.user, other)
+        cls.feed_ids = set(Recipe.objects.filter(
+            author__in=(cls.author, other)
+        ).values_list('id', flat=True))
+
+    def test_walk_feed_to_the_end(self):
+        self.client.force_authenticate(self.user)
+        url = f'/api/recipes/feed/?limit={PAGE_SIZE}'
+        ids = []
+        for _ in range(len(self.feed_ids) // PAGE_SIZE + 1):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            ids.extend(recipe['id'] for recipe in response.data['results'])
+            url = response.data['next']
+            if url is None:
+                break
+        self.assertIsNone(url, 'Лента не закончилась.')
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertEqual(set(ids), self.feed_ids)
+
+    def test_anonymous(self):
+        self.assertEqual(
+            self.client.get('/api/recipes/feed/').status_code, 401
+        )
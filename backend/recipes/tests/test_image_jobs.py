@@ -0,0 +1,51 @@
+from datetime import timedelta
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import override_settings
+from django.utils import timezone
+
+from recipes.image_jobs import claim, finish
+from recipes.models import ImageJob, Recipe
+from recipes.tests.base import FoodgramTestCase
+
+VARIANTS = (('image.jpg', b'image'), ('thumb.jpg', b'thumb'))
+
+
+@override_settings(IMAGE_JOB_LEASE=60)
+class ImageJobTest(FoodgramTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.recipe, = self.create_recipes(1)
+        self.source = default_storage.save(
+            'recipes/images/source.png', ContentFile(b'source')
+        )
+        Recipe.objects.filter(pk=self.recipe.pk).update(image=self.source)
+        self.job = ImageJob.objects.create(
+            content_type=ContentType.objects.get_for_model(Recipe),
+            object_id=self.recipe.pk, field='image', source=self.source
+        )
+
+    def test_stale_job_is_reclaimed(self):
+        self.assertEqual(claim(10), [self.job])
+        self.assertEqual(claim(10), [])
+        ImageJob.objects.filter(pk=self.job.pk).update(
+            claimed_at=timezone.now() - timedelta(seconds=61)
+        )
+        job, = claim(10)
+        finish(job, VARIANTS)
+        job.refresh_from_db()
+        self.assertEqual(job.status, ImageJob.Status.DONE)
+        self.assertFalse(default_storage.exists(self.source))
+
+    def test_lost_race_deletes_source(self):
+        job, = claim(10)
+        Recipe.objects.filter(pk=self.recipe.pk).update(
+            image='recipes/images/newer.png'
+        )
+        finish(job, VARIANTS)
+        self.assertFalse(default_storage.exists(self.source))
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.image.name, 'recipes/images/newer.png')
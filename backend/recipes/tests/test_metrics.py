@@ -0,0 +1,28 @@
+from django.test import override_settings
+
+from recipes.tests.base import FoodgramTestCase
+
+
+class MetricsAccessTest(FoodgramTestCase):
+
+    @override_settings(METRICS_TOKEN='')
+    def test_closed_without_token(self):
+        self.assertEqual(self.client.get('/api/metrics/').status_code, 403)
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get('/api/metrics/').status_code, 403)
+        self.user.is_staff = True
+        self.user.save()
+        self.assertEqual(self.client.get('/api/metrics/').status_code, 200)
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_token(self):
+        self.assertEqual(
+            self.client.get(
+                '/api/metrics/', HTTP_AUTHORIZATION='Bearer wrong'
+            ).status_code, 403
+        )
+        response = self.client.get(
+            '/api/metrics/', HTTP_AUTHORIZATION='Bearer secret'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'foodgram_request_duration_seconds', response.content)
@@ -0,0 +1,66 @@
+from django.utils import timezone
+
+from recipes.models import Recipe
+from recipes.tests.base import FoodgramTestCase
+
+# Больше offset_cutoff (1000) стандартной CursorPagination.
+TIED_RECIPES = 1500
+PAGE_SIZE = 100
+
+
+class RecipeCursorPaginationTest(FoodgramTestCase):
+    """Листание по ключу (поле, id) при одинаковых значениях поля."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        Recipe.objects.bulk_create(
+            Recipe(
+                author=cls.author, name=f'Рецепт {index}', text='Описание',
+                cooking_time=1, image='recipes/images/recipe.png'
+            )
+            for index in range(TIED_RECIPES)
+        )
+        Recipe.objects.update(created=timezone.now(), favorites_count=0)
+        cls.ids = set(Recipe.objects.values_list('id', flat=True))
+
+    def walk(self, url, link='next'):
+        ids = []
+        for _ in range(len(self.ids) // PAGE_SIZE + 1):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            ids.extend(recipe['id'] for recipe in response.data['results'])
+            url = response.data[link]
+            if url is None:
+                return ids
+        self.fail(f'Листание не закончилось, получено {len(ids)} строк.')
+
+    def test_walk_tied_values(self):
+        for ordering in ('-created', '-favorites', 'cooking_time'):
+            with self.subTest(ordering=ordering):
+                ids = self.walk(
+                    f'/api/recipes/?ordering={ordering}&limit={PAGE_SIZE}'
+                )
+                self.assertEqual(len(ids), len(set(ids)))
+                self.assertEqual(set(ids), self.ids)
+                self.assertEqual(
+                    ids, sorted(ids, reverse=ordering.startswith('-'))
+                )
+
+    def test_walk_back(self):
+        url = f'/api/recipes/?ordering=-favorites&limit={PAGE_SIZE}'
+        pages = []
+        while url:
+            response = self.client.get(url)
+            pages.append([recipe['id'] for recipe in response.data['results']])
+            last = response
+            url = response.data['next']
+            self.assertLessEqual(len(pages), len(self.ids) // PAGE_SIZE)
+        back = self.walk(last.data['previous'], link='previous')
+        expected = [id for page in reversed(pages[:-1]) for id in page]
+        self.assertEqual(sorted(back), sorted(expected))
+        self.assertEqual(len(back), len(set(back)))
+
+    def test_invalid_cursor(self):
+        response = self.client.get('/api/recipes/?cursor=bm90LWEtY3Vyc29y')
+        self.assertEqual(response.status_code, 404)
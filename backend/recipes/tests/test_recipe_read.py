@@ -0,0 +1,52 @@
+from recipes.tests.base import FoodgramTestCase
+
+LIST_QUERIES = 4
+DETAIL_QUERIES = 3
+
+
+class RecipeReadQueriesTest(FoodgramTestCase):
+    """Список и деталь рецепта читаются фиксированным числом запросов."""
+
+    def assert_list_queries(self):
+        created = 0
+        for total in (1, 10):
+            self.create_recipes(total - created)
+            created = total
+            self.clear_cache()
+            with self.assertNumQueries(LIST_QUERIES):
+                response = self.client.get('/api/recipes/', {'limit': 10})
+            self.assertEqual(len(response.data['results']), total)
+        return response.data['results'][0]
+
+    def assert_detail_queries(self):
+        recipe, = self.create_recipes(1)
+        self.clear_cache()
+        with self.assertNumQueries(DETAIL_QUERIES):
+            response = self.client.get(f'/api/recipes/{recipe.id}/')
+        return response.data
+
+    def test_list_anonymous(self):
+        recipe = self.assert_list_queries()
+        self.assertFalse(recipe['is_favorited'])
+        self.assertFalse(recipe['author']['is_subscribed'])
+        self.assertEqual(len(recipe['ingredients']), len(self.ingredients))
+        self.assertEqual(len(recipe['tags']), len(self.tags))
+
+    def test_list_authenticated(self):
+        self.client.force_authenticate(self.user)
+        self.follow(self.user, self.author)
+        recipe = self.assert_list_queries()
+        self.assertTrue(recipe['is_favorited'])
+        self.assertTrue(recipe['is_in_shopping_cart'])
+        self.assertTrue(recipe['author']['is_subscribed'])
+
+    def test_detail_anonymous(self):
+        recipe = self.assert_detail_queries()
+        self.assertFalse(recipe['is_in_shopping_cart'])
+
+    def test_detail_authenticated(self):
+        self.client.force_authenticate(self.user)
+        self.follow(self.user, self.author)
+        recipe = self.assert_detail_queries()
+        self.assertTrue(recipe['is_favorited'])
+        self.assertTrue(recipe['author']['is_subscribed'])
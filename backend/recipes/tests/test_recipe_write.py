@@ -0,0 +1,121 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from recipes.models import Ingredients, Recipe, RecipeIngredients
+from recipes.tests.base import IMAGE, FoodgramTestCase
+
+CREATE_QUERIES = 14
+UPDATE_QUERIES = 16
+INGREDIENTS_SELECT = 'FROM "recipes_ingredients"'
+
+
+class RecipeWriteTest(FoodgramTestCase):
+    """Состав рецепта проверяется и пишется одним запросом id__in."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.ingredients += [
+            Ingredients.objects.create(
+                name=f'Ингредиент {index}', measurement_unit='г'
+            )
+            for index in range(5, 30)
+        ]
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.author)
+
+    def payload(self, ingredient_ids):
+        return {
+            'tags': [tag.id for tag in self.tags],
+            'ingredients': [
+                {'id': id, 'amount': 5} for id in ingredient_ids
+            ],
+            'name': 'Рецепт',
+            'image': IMAGE,
+            'text': 'Описание',
+            'cooking_time': 10,
+        }
+
+    def send(self, method, url, ingredient_ids):
+        with CaptureQueriesContext(connection) as context:
+            response = getattr(self.client, method)(
+                url, self.payload(ingredient_ids), format='json'
+            )
+        ingredient_queries = [
+            query for query in context.captured_queries
+            if INGREDIENTS_SELECT in query['sql']
+        ]
+        return response, len(context), len(ingredient_queries)
+
+    def test_create_queries_do_not_depend_on_ingredients(self):
+        for total in (1, 30):
+            response, queries, ingredient_queries = self.send(
+                'post', '/api/recipes/',
+                [ingredient.id for ingredient in self.ingredients[:total]]
+            )
+            self.assertEqual(response.status_code, 201, response.data)
+            self.assertEqual(len(response.data['ingredients']), total)
+            self.assertEqual(queries, CREATE_QUERIES)
+            self.assertEqual(ingredient_queries, 1)
+
+    def test_update_queries_do_not_depend_on_ingredients(self):
+        recipe, = self.create_recipes(1)
+        for ingredients in (self.ingredients[:1], self.ingredients[1:]):
+            response, queries, ingredient_queries = self.send(
+                'patch', f'/api/recipes/{recipe.id}/',
+                [ingredient.id for ingredient in ingredients]
+            )
+            self.assertEqual(response.status_code, 200, response.data)
+            self.assertEqual(queries, UPDATE_QUERIES)
+            self.assertEqual(ingredient_queries, 1)
+        self.assertEqual(
+            set(RecipeIngredients.objects.filter(
+                recipe=recipe
+            ).values_list('ingredients_id', flat=True)),
+            {ingredient.id for ingredient in self.ingredients[1:]}
+        )
+
+    def test_unknown_ingredient(self):
+        missing = max(ingredient.id for ingredient in self.ingredients) + 1
+        response, _, ingredient_queries = self.send(
+            'post', '/api/recipes/', [self.ingredients[0].id, missing]
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn(str(missing), str(response.data))
+        self.assertEqual(ingredient_queries, 1)
+        self.assertFalse(Recipe.objects.exists())
+
+    def test_duplicate_ingredient(self):
+        id = self.ingredients[0].id
+        response, _, ingredient_queries = self.send(
+            'post', '/api/recipes/', [id, id]
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(ingredient_queries, 0)
+        self.assertFalse(Recipe.objects.exists())
+
+
+class UserRecipeAddTest(FoodgramTestCase):
+    """Избранное и корзина: вставка и счётчик в одной транзакции."""
+
+    def setUp(self):
+        super().setUp()
+        self.recipe = Recipe.objects.create(
+            author=self.author, name='Рецепт', text='Описание',
+            cooking_time=5, image='recipes/images/recipe.png'
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_add_favorite(self):
+        path = f'/api/recipes/{self.recipe.id}/favorite/'
+        self.assertEqual(self.client.post(path).status_code, 201)
+        self.assertEqual(self.client.post(path).status_code, 400)
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.favorites_count, 1)
+
+    def test_add_unknown_recipe(self):
+        self.assertEqual(
+            self.client.post('/api/recipes/0/shopping_cart/').status_code, 404
+        )
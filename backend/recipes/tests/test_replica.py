@@ -0,0 +1,72 @@
+from unittest import mock
+
+from foodgram_backend.routers import PIN_COOKIE, REPLICA, ReplicaRouter
+from recipes.tests.base import FoodgramTestCase
+
+db_for_read = ReplicaRouter.db_for_read
+
+
+class ReplicaRoutingTest(FoodgramTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.recipe = self.create_recipes(1)[0]
+        self.client.force_authenticate(self.user)
+
+    def read_aliases(self, method, path, **extra):
+        """Базы, выбранные роутером для чтения во время запроса."""
+        aliases = set()
+
+        def spy(router, model, **hints):
+            alias = db_for_read(router, model, **hints)
+            aliases.add(alias)
+            return alias
+
+        with mock.patch.object(ReplicaRouter, 'db_for_read', spy):
+            response = getattr(self.client, method)(path, **extra)
+        self.assertLess(response.status_code, 400)
+        return aliases
+
+    def test_list_and_retrieve_read_replica(self):
+        for path in (
+            '/api/recipes/', f'/api/recipes/{self.recipe.id}/',
+            '/api/users/', f'/api/users/{self.author.id}/',
+        ):
+            with self.subTest(path=path):
+                self.assertEqual(self.read_aliases('get', path), {REPLICA})
+
+    def test_other_actions_read_default(self):
+        self.assertEqual(
+            self.read_aliases('get', '/api/users/subscriptions/'),
+            {'default'}
+        )
+        self.assertEqual(
+            self.read_aliases(
+                'delete', f'/api/recipes/{self.recipe.id}/favorite/'
+            ),
+            {'default'}
+        )
+
+    def test_write_pins_reads_to_default(self):
+        self.read_aliases('delete', f'/api/recipes/{self.recipe.id}/favorite/')
+        self.assertIn(PIN_COOKIE, self.client.cookies)
+        self.assertEqual(
+            self.read_aliases('get', '/api/recipes/'), {'default'}
+        )
+
+    def test_header_pins_reads_to_default(self):
+        self.assertEqual(
+            self.read_aliases(
+                'get', '/api/recipes/', HTTP_X_READ_PRIMARY='1'
+            ),
+            {'default'}
+        )
+
+    def test_cached_responses_read_default(self):
+        for path in ('/api/tags/', '/api/ingredients/'):
+            with self.subTest(path=path):
+                self.assertEqual(self.read_aliases('get', path), {'default'})
+        self.client.force_authenticate(None)
+        self.assertEqual(
+            self.read_aliases('get', '/api/recipes/'), {'default'}
+        )
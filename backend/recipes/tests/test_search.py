@@ -0,0 +1,19 @@
+from recipes.models import Recipe
+from recipes.tests.base import FoodgramTestCase
+
+
+class SearchSnippetTest(FoodgramTestCase):
+
+    def test_snippet_escapes_text(self):
+        Recipe.objects.create(
+            author=self.author, name='Борщ', cooking_time=5,
+            text='<script>alert(1)</script> Борщ "по-домашнему"',
+            image='recipes/images/recipe.png'
+        )
+        response = self.client.get('/api/recipes/', {'search': 'борщ'})
+        snippet = response.data['results'][0]['snippet']
+        self.assertEqual(
+            snippet,
+            '&lt;script&gt;alert(1)&lt;/script&gt; <b>Борщ</b> '
+            '&quot;по-домашнему&quot;'
+        )
@@ -0,0 +1,32 @@
+from django.test import AsyncClient
+from rest_framework.authtoken.models import Token
+
+from recipes.tests.base import FoodgramTestCase
+
+
+class ShoppingListTest(FoodgramTestCase):
+    """Список покупок отдаётся потоком и под WSGI, и под ASGI."""
+
+    def setUp(self):
+        super().setUp()
+        self.create_recipes(2)
+        self.token = Token.objects.create(user=self.user)
+
+    def test_wsgi(self):
+        self.client.force_authenticate(self.user)
+        response = self.client.get('/api/recipes/download_shopping_cart/')
+        self.assertTrue(response.streaming)
+        content = b''.join(response.streaming_content).decode()
+        self.assertIn('- Ингредиент 0 (г) - 20', content)
+
+    async def test_asgi(self):
+        response = await AsyncClient().get(
+            '/api/recipes/download_shopping_cart/',
+            authorization=f'Token {self.token.key}'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertIn(
+            '- Ингредиент 0 (г) - 20',
+            b''.join(response.streaming_content).decode()
+        )
@@ -0,0 +1,22 @@
+from django.http import Http404
+
+from recipes.shortlinks import get_recipe_id, get_short_code
+from recipes.tests.base import FoodgramTestCase
+
+
+class ShortLinkTest(FoodgramTestCase):
+
+    def setUp(self):
+        super().setUp()
+        get_short_code.cache_clear()
+        get_recipe_id.cache_clear()
+
+    def test_deleted_recipe_link_is_not_served_from_cache(self):
+        recipe, = self.create_recipes(1)
+        code = get_short_code(recipe.id)
+        self.assertEqual(get_recipe_id(code), recipe.id)
+        recipe.delete()
+        with self.assertRaises(Http404):
+            get_recipe_id(code)
+        with self.assertRaises(Http404):
+            get_short_code(recipe.id)
@@ -0,0 +1,62 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
+
+from recipes.tests.base import IMAGE, FoodgramTestCase
+from users.authentication import token_cache
+
+TOKEN_SELECT = 'FROM "authtoken_token" INNER JOIN'
+
+
+class TokenCacheTest(FoodgramTestCase):
+    """Кеш токенов: снимок пользователя только для безопасных запросов."""
+
+    def setUp(self):
+        super().setUp()
+        token_cache._entries.clear()
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def token_queries(self, method, path, **kwargs):
+        with CaptureQueriesContext(connection) as context:
+            response = getattr(self.client, method)(path, **kwargs)
+        self.assertLess(response.status_code, 400)
+        return sum(TOKEN_SELECT in query['sql'] for query in context)
+
+    def test_hit_and_miss(self):
+        self.assertEqual(self.token_queries('get', '/api/users/me/'), 1)
+        self.assertEqual(self.token_queries('get', '/api/users/me/'), 0)
+
+    def test_unsafe_methods_skip_cache(self):
+        self.token_queries('get', '/api/users/me/')
+        self.assertEqual(
+            self.token_queries(
+                'put', '/api/users/me/avatar/', data={'avatar': IMAGE},
+                format='json'
+            ),
+            1
+        )
+
+    def test_logout_invalidates(self):
+        self.client.get('/api/users/me/')
+        self.assertEqual(
+            self.client.post('/api/auth/token/logout/').status_code, 204
+        )
+        self.assertEqual(self.client.get('/api/users/me/').status_code, 401)
+
+    def test_write_keeps_counters(self):
+        self.client.get('/api/users/me/')
+        response = self.client.post('/api/recipes/', {
+            'tags': [tag.id for tag in self.tags],
+            'ingredients': [{'id': self.ingredients[0].id, 'amount': 5}],
+            'name': 'Рецепт',
+            'image': IMAGE,
+            'text': 'Описание',
+            'cooking_time': 10,
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.client.put(
+            '/api/users/me/avatar/', {'avatar': IMAGE}, format='json'
+        )
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.recipes_count, 1)
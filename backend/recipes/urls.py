@@ -2,6 +2,7 @@ from django.urls import path
 from rest_framework.routers import SimpleRouter
 from django.urls import include
 
+from foodgram_backend.metrics import metrics
 from .views import TagViewSet, RecipeViewSet, IngredientsViewSet
 from users.views import UserViewSet, get_jwt_token, user_logout
 
@@ -15,5 +16,6 @@ router_v1.register(r'users', UserViewSet)
 urlpatterns = [
     path('auth/token/login/', get_jwt_token),
     path('auth/token/logout/', user_logout),
+    path('metrics/', metrics),
     path('', include(router_v1.urls)),
 ]
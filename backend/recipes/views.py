@@ -1,9 +1,9 @@
-from datetime import datetime
-
-import pyshorteners
+from django.conf import settings
 from django.db.models import Sum
-from django.http import HttpResponse
-from django.shortcuts import get_object_or_404
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from django.shortcuts import get_object_or_404, redirect
+from django.urls import reverse
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import viewsets
 from rest_framework.permissions import (
@@ -20,6 +20,7 @@ from .models import (
     Recipe, Tag, Ingredients,
     FavoriteRecipe, ShoppingCart, RecipeIngredients
 )
+from .cache import CachedResponseMixin
 from .mixins import ListRetriveViewSet
 from .serializers import (
     RecipeSerializer, IngredientsSerializer, TagSerializer,
@@ -27,13 +28,23 @@ from .serializers import (
 )
 from .permissions import IsAdminOrReadOnly, IsAuthorOrReadOnly
 from .filters import IngredientFilter, RecipeFilter
-from foodgram_backend.pagination import CustomPagination
+from .renderers import SHOPPING_LIST_RENDERERS, ShoppingListNegotiation
+from .search import ingredient_index
+from .shortlinks import get_recipe_id, get_short_code
+from foodgram_backend.pagination import (
+    CustomPagination, RecipeCursorPagination
+)
+from foodgram_backend.routers import ReplicaReadMixin
 
 
 User = get_user_model()
 
+SHOPPING_LIST_CHUNK_SIZE = 500
 
-class RecipeViewSet(viewsets.ModelViewSet):
+
+class RecipeViewSet(
+    ReplicaReadMixin, CachedResponseMixin, viewsets.ModelViewSet
+):
     """Вьюсет для модели рецептов."""
 
     queryset = Recipe.objects.all()
@@ -42,6 +53,39 @@ class RecipeViewSet(viewsets.ModelViewSet):
     pagination_class = CustomPagination
     filter_backends = (DjangoFilterBackend,)
     filterset_class = RecipeFilter
+    cache_namespace = 'recipes'
+
+    def is_cacheable(self, request):
+        """Кешируются только ответы анонимным пользователям."""
+        return request.user.is_anonymous
+
+    @property
+    def paginator(self):
+        """
+        Курсорная пагинация, если клиент передал ordering или cursor.
+        Результаты поиска и подбора по ингредиентам упорядочены
+        по рангу и листаются по страницам.
+        """
+        if not hasattr(self, '_paginator'):
+            params = self.request.query_params
+            if 'search' in params or 'have' in params:
+                self._paginator = self.pagination_class()
+            elif (
+                RecipeCursorPagination.ordering_param in params
+                or RecipeCursorPagination.cursor_query_param in params
+            ):
+                self._paginator = RecipeCursorPagination()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.request.method in SAFE_METHODS:
+            queryset = queryset.with_related().with_user_flags(
+                self.request.user
+            )
+        return queryset
 
     def perform_create(self, serializer):
         serializer.save(author=self.request.user)
@@ -80,13 +124,12 @@ class RecipeViewSet(viewsets.ModelViewSet):
         return self.delete_from(ShoppingCart, request.user, pk)
 
     def add_to(self, model, user, pk):
-        if model.objects.filter(user=user, recipe__id=pk).exists():
+        recipe = get_object_or_404(Recipe, id=pk)
+        if not model.objects.add(user, recipe):
             return Response(
                 {'errors': 'Рецепт уже добавлен!'},
                 status=status.HTTP_400_BAD_REQUEST
             )
-        recipe = get_object_or_404(Recipe, id=pk)
-        model.objects.create(user=user, recipe=recipe)
         serializer = RecipeShortSerializer(recipe)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
@@ -100,61 +143,92 @@ class RecipeViewSet(viewsets.ModelViewSet):
             status=status.HTTP_400_BAD_REQUEST
         )
 
+    @action(detail=False, permission_classes=[IsAuthenticated])
+    def feed(self, request):
+        """Новые рецепты авторов из подписок пользователя."""
+        queryset = self.filter_queryset(
+            Recipe.objects.feed(request.user).with_related().with_user_flags(
+                request.user
+            )
+        )
+        paginator = RecipeCursorPagination()
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        serializer = RecipeSerializer(
+            page, many=True, context=self.get_serializer_context()
+        )
+        return paginator.get_paginated_response(serializer.data)
+
     @action(detail=True, methods=('get',), url_path='get-link')
     def get_short_link(self, request, pk):
         """Получить короткую ссылку на рецепт."""
-        shortener = pyshorteners.Shortener()
-        short_url = shortener.tinyurl.short(
-            request.build_absolute_uri()
-            .replace('/api', '')
-            .replace('/get-link/', '')
+        code = get_short_code(pk)
+        short_url = request.build_absolute_uri(
+            reverse('short-link', args=(code,))
         )
         return Response({'short-link': short_url})
 
-    @action(detail=False, permission_classes=[IsAuthenticated])
+    @action(
+        detail=False, permission_classes=[IsAuthenticated],
+        renderer_classes=SHOPPING_LIST_RENDERERS,
+        content_negotiation_class=ShoppingListNegotiation,
+    )
     def download_shopping_cart(self, request):
-        """Скачать список покупок."""
+        """Скачать список покупок в формате txt, csv или pdf."""
         user = request.user
         if not user.shopping_cart.exists():
             return Response(status=status.HTTP_400_BAD_REQUEST)
-
-        ingredients = RecipeIngredients.objects.filter(
-            recipe__shopping_cart__user=request.user
-        ).values(
-            'ingredients__name',
-            'ingredients__measurement_unit'
-        ).annotate(amount=Sum('amount'))
-
-        today = datetime.today()
-        shopping_list = (
-            f'Список покупок для: {user.get_full_name()}\n\n'
-            f'Дата: {today:%Y-%m-%d}\n\n'
+        ingredients = shopping_list(user).iterator(
+            chunk_size=SHOPPING_LIST_CHUNK_SIZE
+        )
+        if isinstance(request._request, ASGIRequest):
+            # Под ASGI Django 3.2 читает потоковый ответ в цикле событий,
+            # где запросы к базе запрещены: строки (по одной на ингредиент)
+            # читаются здесь, файл по-прежнему отдаётся потоком.
+            ingredients = list(ingredients)
+        return shopping_list_response(
+            user, request.accepted_renderer, ingredients
         )
-        shopping_list += '\n'.join([
-            f'- {ingredient["ingredients__name"]} '
-            f'({ingredient["ingredients__measurement_unit"]})'
-            f' - {ingredient["amount"]}'
-            for ingredient in ingredients
-        ])
-        shopping_list += f'\n\nFoodgram ({today:%Y})'
 
-        filename = f'{user.username}_shopping_list.txt'
-        response = HttpResponse(shopping_list, content_type='text/plain')
-        response['Content-Disposition'] = f'attachment; filename={filename}'
 
-        return response
+def shopping_list(user):
+    """Суммы ингредиентов из корзины пользователя по алфавиту."""
+    return RecipeIngredients.objects.filter(
+        recipe__shopping_cart__user=user
+    ).values(
+        'ingredients__name',
+        'ingredients__measurement_unit'
+    ).annotate(
+        total_amount=Sum('amount')
+    ).order_by('ingredients__name')
 
 
-class TagViewSet(ListRetriveViewSet):
+def shopping_list_response(user, renderer, ingredients):
+    filename = f'{user.username}_shopping_list.{renderer.format}'
+    content_type = renderer.media_type
+    if renderer.charset:
+        content_type += f'; charset={renderer.charset}'
+    response = StreamingHttpResponse(
+        renderer.stream(user, ingredients), content_type=content_type
+    )
+    response['Content-Disposition'] = f'attachment; filename={filename}'
+    return response
+
+
+class TagViewSet(
+    ReplicaReadMixin, CachedResponseMixin, ListRetriveViewSet
+):
     """Вьюсет модели тэгов."""
 
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
     permission_classes = [AllowAny]
     pagination_class = None
+    cache_namespace = 'tags'
 
 
-class IngredientsViewSet(ListRetriveViewSet):
+class IngredientsViewSet(
+    ReplicaReadMixin, CachedResponseMixin, ListRetriveViewSet
+):
     """Вьюсет модели ингридиентов."""
 
     queryset = Ingredients.objects.all()
@@ -163,3 +237,20 @@ class IngredientsViewSet(ListRetriveViewSet):
     permission_classes = [AllowAny]
     filterset_class = IngredientFilter
     pagination_class = None
+    cache_namespace = 'ingredients'
+
+    @action(detail=False, url_path='autocomplete')
+    def autocomplete(self, request):
+        """Автодополнение: сначала совпадения по началу названия."""
+        limit = settings.INGREDIENT_AUTOCOMPLETE_LIMIT
+        try:
+            limit = min(int(request.query_params['limit']), limit)
+        except (KeyError, ValueError):
+            pass
+        name = request.query_params.get('name', '')
+        return Response(ingredient_index.search(name, max(limit, 1)))
+
+
+def short_link_redirect(request, code):
+    """Перенаправить короткую ссылку на страницу рецепта."""
+    return redirect(f'/recipes/{get_recipe_id(code)}')
@@ -27,9 +27,11 @@ class RecipeAdmin(admin.ModelAdmin):
     search_fields = ('name', 'author',)
     list_filter = ('tags',)
 
-    @admin.display(description='Количество в избранных')
+    @admin.display(
+        description='Количество в избранных', ordering='favorites_count'
+    )
     def added_in_favorites(self, obj):
-        return obj.users_recipes.count()
+        return obj.favorites_count
 
 
 admin.site.register(MyUser, MyUserAdmin)
@@ -0,0 +1,21 @@
+"""Асинхронная загрузка аватара для режима ASGI (foodgram_backend.asgi_urls)."""
+from django.http import HttpResponse, JsonResponse
+
+from foodgram_backend.async_api import async_api_view, in_pool
+from .views import delete_avatar, put_avatar
+
+
+@async_api_view('PUT', 'DELETE')
+async def avatar(request):
+    """
+    Аватар. Декодирование, обработка изображения
+    и запись файла выполняются в пуле потоков.
+    """
+    if request.method == 'PUT':
+        data = await in_pool(put_avatar)(request.user, request.data)
+        if data is None:
+            return HttpResponse(status=400)
+        return JsonResponse(data)
+    if not await in_pool(delete_avatar)(request.user):
+        return HttpResponse(status=400)
+    return HttpResponse(status=204)
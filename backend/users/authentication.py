@@ -0,0 +1,119 @@
+import copy
+import hashlib
+import time
+from collections import OrderedDict
+from threading import Lock
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.permissions import SAFE_METHODS
+
+from foodgram_backend.metrics import MetricCounter, register
+
+TOKEN_CACHE_KEY = 'auth-token:{}'
+
+TOKEN_CACHE_HITS = register(MetricCounter(
+    'foodgram_token_cache_hits_total',
+    'Токены, найденные в кеше аутентификации.'
+))
+TOKEN_CACHE_MISSES = register(MetricCounter(
+    'foodgram_token_cache_misses_total',
+    'Токены, за которыми пришлось идти в базу.'
+))
+
+
+class TokenCache:
+    """
+    Кеш токен -> снимок пользователя.
+    Без общего бэкенда записи живут в LRU процесса не дольше ttl:
+    invalidate() очищает только текущий воркер, остальные принимают
+    отозванный токен до истечения ttl (по умолчанию 5 секунд).
+    С TOKEN_CACHE_ALIAS записи хранятся только в общем кеше,
+    чтобы выход из системы сразу действовал во всех воркерах.
+    """
+
+    def __init__(self, ttl, size, alias=None):
+        self.ttl = ttl
+        self.size = size
+        self.alias = alias
+        self._lock = Lock()
+        self._entries = OrderedDict()
+
+    @staticmethod
+    def cache_key(key):
+        return TOKEN_CACHE_KEY.format(hashlib.sha256(key.encode()).hexdigest())
+
+    def get(self, key):
+        if self.alias:
+            user = caches[self.alias].get(self.cache_key(key))
+            if user is not None:
+                TOKEN_CACHE_HITS.inc((('level', 'shared'),))
+            return user
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            user, expires = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        TOKEN_CACHE_HITS.inc((('level', 'local'),))
+        return copy.copy(user)
+
+    def set(self, key, user):
+        if self.alias:
+            caches[self.alias].set(self.cache_key(key), user, self.ttl)
+            return
+        with self._lock:
+            self._entries[key] = (copy.copy(user), time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, *keys):
+        if self.alias:
+            caches[self.alias].delete_many(
+                [self.cache_key(key) for key in keys]
+            )
+            return
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+
+token_cache = TokenCache(
+    ttl=settings.TOKEN_CACHE_TTL,
+    size=settings.TOKEN_CACHE_SIZE,
+    alias=settings.TOKEN_CACHE_ALIAS or None,
+)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication, которая не ходит в базу для известных токенов.
+    Снимок из кеша используется только в безопасных запросах:
+    вьюхи сохраняют request.user целиком, а счётчики и статус
+    аватара меняются через update() без post_save, и сохранение
+    снимка затёрло бы их устаревшими значениями.
+    """
+
+    use_cache = True
+
+    def authenticate(self, request):
+        self.use_cache = request.method in SAFE_METHODS
+        return super().authenticate(request)
+
+    def authenticate_credentials(self, key):
+        user = token_cache.get(key) if self.use_cache else None
+        if user is None:
+            TOKEN_CACHE_MISSES.inc()
+            user, token = super().authenticate_credentials(key)
+            token_cache.set(key, user)
+            return user, token
+        if not user.is_active:
+            raise AuthenticationFailed('User inactive or deleted.')
+        return user, Token(key=key, user=user)
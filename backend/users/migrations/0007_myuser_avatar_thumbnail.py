@@ -0,0 +1,18 @@
+# Generated by Django 3.2.3 on 2026-10-18 06:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0006_myuser_recipes_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='myuser',
+            name='avatar_thumbnail',
+            field=models.ImageField(blank=True, default=None, editable=False, null=True, upload_to='avatars/thumbnails/', verbose_name='Миниатюра аватара'),
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 3.2.3 on 2026-10-18 06:28
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.db.models.expressions
+import users.models
+
+
+def delete_invalid_follows(apps, schema_editor):
+    Follow = apps.get_model('users', 'Follow')
+    Follow.objects.filter(
+        models.Q(user__isnull=True)
+        | models.Q(following__isnull=True)
+        | models.Q(user=models.F('following'))
+    ).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0008_myuser_avatar_status'),
+    ]
+
+    operations = [
+        migrations.AlterModelManagers(
+            name='myuser',
+            managers=[
+                ('objects', users.models.MyUserManager()),
+            ],
+        ),
+        migrations.RemoveConstraint(
+            model_name='follow',
+            name='following_unique',
+        ),
+        migrations.RunPython(
+            delete_invalid_follows, migrations.RunPython.noop
+        ),
+        migrations.AlterField(
+            model_name='follow',
+            name='following',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='following', to='users.myuser', verbose_name='Автор'),
+        ),
+        migrations.AlterField(
+            model_name='follow',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='followers', to='users.myuser', verbose_name='Подписчик'),
+        ),
+        migrations.AddIndex(
+            model_name='follow',
+            index=models.Index(fields=['following', 'user'], name='follow_following_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='follow',
+            constraint=models.UniqueConstraint(fields=('user', 'following'), name='unique_follow'),
+        ),
+        migrations.AddConstraint(
+            model_name='follow',
+            constraint=models.CheckConstraint(check=models.Q(('user', django.db.models.expressions.F('following')), _negated=True), name='no_self_follow'),
+        ),
+    ]
@@ -1,5 +1,26 @@
 from django.db import models
-from django.contrib.auth.models import AbstractUser
+from django.db.models import Exists, OuterRef, Value
+from django.contrib.auth.models import AbstractUser, UserManager
+
+from foodgram_backend.images import ImageStatus
+
+
+class MyUserQuerySet(models.QuerySet):
+    """Выборки пользователей."""
+
+    def with_is_subscribed(self, user):
+        """Аннотировать флаг подписки user одним подзапросом на страницу."""
+        if user.is_anonymous:
+            return self.annotate(
+                is_subscribed=Value(False, output_field=models.BooleanField())
+            )
+        return self.annotate(is_subscribed=Exists(
+            Follow.objects.filter(user=user, following=OuterRef('pk'))
+        ))
+
+
+class MyUserManager(UserManager.from_queryset(MyUserQuerySet)):
+    pass
 
 
 class MyUser(AbstractUser):
@@ -12,6 +33,19 @@ class MyUser(AbstractUser):
         null=True,
         default=None
     )
+    avatar_thumbnail = models.ImageField(
+        'Миниатюра аватара',
+        upload_to='avatars/thumbnails/',
+        blank=True,
+        null=True,
+        default=None,
+        editable=False
+    )
+    avatar_status = models.CharField(
+        'Статус обработки аватара', max_length=16,
+        choices=ImageStatus.choices, default=ImageStatus.READY,
+        editable=False
+    )
     email = models.EmailField(
         'Почта', blank=False, unique=True, max_length=250
     )
@@ -19,6 +53,11 @@ class MyUser(AbstractUser):
         'Имя пользователя', blank=False, unique=True, max_length=150
     )
     password = models.CharField('Пароль', blank=False, max_length=250)
+    recipes_count = models.PositiveIntegerField(
+        'Количество рецептов', default=0, editable=False
+    )
+
+    objects = MyUserManager()
 
 
 class Follow(models.Model):
@@ -27,23 +66,31 @@ class Follow(models.Model):
     user = models.ForeignKey(
         MyUser, on_delete=models.CASCADE,
         related_name='followers',
-        blank=True, null=True
+        verbose_name='Подписчик',
     )
     following = models.ForeignKey(
         MyUser,
         on_delete=models.CASCADE,
         related_name='following',
-        blank=True,
-        null=True
+        verbose_name='Автор',
     )
 
     class Meta:
         constraints = (
             models.UniqueConstraint(
-                fields=('following',),
-                name='following_unique'
+                fields=('user', 'following'),
+                name='unique_follow'
+            ),
+            models.CheckConstraint(
+                check=~models.Q(user=models.F('following')),
+                name='no_self_follow'
+            ),
+        )
+        indexes = (
+            models.Index(
+                fields=('following', 'user'), name='follow_following_idx'
             ),
         )
 
     def __str__(self) -> str:
-        return self.user.username
+        return f'{self.user} подписан на {self.following}'
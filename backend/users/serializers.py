@@ -1,29 +1,78 @@
 import re
-import base64
+from pathlib import Path
 
 from rest_framework import serializers, status
-from django.core.files.base import ContentFile
+from django.conf import settings
 from django.contrib.auth import get_user_model
 
+from foodgram_backend.images import (
+    ImageDecodeError, ImageTooLargeError, check_image_header, decode_base64,
+    normalize_image
+)
 from recipes.models import Recipe
+from .models import Follow
 
 User = get_user_model()
 
 
 class Base64ImageField(serializers.ImageField):
-    """Собственное поле для изображений."""
+    """
+    Собственное поле для изображений.
+    Base64 декодируется частями с ограничением размера,
+    изображение приводится к единому формату.
+    """
+
+    default_error_messages = {
+        'invalid_base64': 'Некорректные данные base64.',
+        'too_large': 'Размер изображения превышает {max_size} байт.',
+    }
 
     def to_internal_value(self, data):
         if isinstance(data, str) and data.startswith('data:image'):
             format, imgstr = data.split(';base64,')
             ext = format.split('/')[-1]
-
-            data = ContentFile(base64.b64decode(imgstr), name='temp.' + ext)
-
-        return super().to_internal_value(data)
+            try:
+                data = decode_base64(imgstr, name='temp.' + ext)
+            except ImageTooLargeError as error:
+                self.fail('too_large', max_size=error.args[0])
+            except ImageDecodeError:
+                self.fail('invalid_base64')
+
+        if settings.IMAGE_PROCESSING_ASYNC:
+            return self.store_raw(data)
+        return normalize_image(super().to_internal_value(data))
+
+    def store_raw(self, data):
+        """
+        Принять файл без декодирования: проверить только заголовок.
+        Нормализацию и миниатюры сделает фоновый обработчик.
+        """
+        file = serializers.FileField.to_internal_value(self, data)
+        try:
+            ext = check_image_header(file)
+        except ImageDecodeError:
+            self.fail('invalid_image')
+        file.name = f'{Path(file.name).stem}.{ext}'
+        return file
+
+
+class ThumbnailField(serializers.ImageField):
+    """Миниатюра изображения; пока её нет, отдаётся исходное."""
+
+    def __init__(self, fallback, **kwargs):
+        self.fallback = fallback
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def get_attribute(self, instance):
+        return (
+            super().get_attribute(instance)
+            or getattr(instance, self.fallback)
+        )
 
 
 class RecipeMinifiedSerializer(serializers.ModelSerializer):
+    image = ThumbnailField(source='thumbnail', fallback='image')
 
     class Meta:
         model = Recipe
@@ -121,6 +170,7 @@ class UserListSerializer(serializers.ModelSerializer):
 
     is_subscribed = serializers.SerializerMethodField(read_only=True)
     avatar = Base64ImageField(use_url=True, required=False)
+    avatar_thumbnail = ThumbnailField(fallback='avatar')
 
     class Meta:
         model = User
@@ -132,20 +182,24 @@ class UserListSerializer(serializers.ModelSerializer):
             'last_name',
             'is_subscribed',
             'avatar',
+            'avatar_thumbnail',
+            'avatar_status',
         )
 
     def get_is_subscribed(self, obj):
+        if hasattr(obj, 'is_subscribed'):
+            return obj.is_subscribed
         request = self.context.get('request')
         if request and hasattr(request, 'user'):
             user = request.user
             if user.is_anonymous:
                 return False
-            return (user.followers.all().exists()) and (user != obj)
+            return Follow.objects.filter(user=user, following=obj).exists()
         return False
 
 
 class RecipeShortSerializer(serializers.ModelSerializer):
-    image = Base64ImageField()
+    image = ThumbnailField(source='thumbnail', fallback='image')
 
     class Meta:
         model = Recipe
@@ -170,7 +224,9 @@ class SubscribeSerializer(UserListSerializer):
     def validate(self, data):
         user_for_subscription = self.instance
         user = self.context['request'].user
-        if user_for_subscription.following.all().exists():
+        if Follow.objects.filter(
+            user=user, following=user_for_subscription
+        ).exists():
             raise serializers.ValidationError(
                 detail='Вы уже подписаны на этого пользователя!',
                 code=status.HTTP_400_BAD_REQUEST
@@ -183,9 +239,12 @@ class SubscribeSerializer(UserListSerializer):
         return data
 
     def get_recipes_count(self, obj):
-        return obj.recipes.count()
+        return obj.recipes_count
 
     def get_recipes(self, obj):
+        recipes = getattr(obj, 'recent_recipes', None)
+        if recipes is not None:
+            return RecipeShortSerializer(recipes, many=True).data
         request = self.context.get('request')
         limit = request.GET.get('recipes_limit')
         recipes = obj.recipes.all()
@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from foodgram_backend.images import pop_pending_image, prepare_image
+from recipes.image_jobs import enqueue
+from .authentication import token_cache
+from .models import MyUser
+
+
+@receiver(pre_save, sender=MyUser)
+def prepare_avatar(sender, instance, **kwargs):
+    prepare_image(
+        instance, 'avatar', 'avatar_thumbnail', 'avatar_status',
+        settings.AVATAR_THUMBNAIL_SIZE
+    )
+
+
+@receiver(post_save, sender=MyUser)
+def enqueue_avatar(sender, instance, **kwargs):
+    if pop_pending_image(instance, 'avatar'):
+        enqueue(instance, 'avatar')
+
+
+@receiver(post_save, sender=MyUser)
+def invalidate_user_tokens(sender, instance, created, **kwargs):
+    """Снимок пользователя в кеше токенов устарел после сохранения."""
+    if not created:
+        token_cache.invalidate(*Token.objects.filter(
+            user=instance
+        ).values_list('key', flat=True))
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_token(sender, instance, **kwargs):
+    token_cache.invalidate(instance.key)
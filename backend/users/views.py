@@ -1,3 +1,6 @@
+from collections import defaultdict
+
+from django.db.models import BooleanField, Value
 from django.shortcuts import get_object_or_404
 from rest_framework import viewsets, status
 from rest_framework.decorators import action, permission_classes, api_view
@@ -11,24 +14,32 @@ from django.contrib.auth import get_user_model
 from rest_framework.authtoken.models import Token
 
 
+from .authentication import token_cache
 from .serializers import (
     UserSerializer, TokenObtainSerializer, UserPasswordSerializer,
     UserListSerializer, RecipeMinifiedSerializer, SubscribeSerializer,
     AvatarSerializer
 )
+from recipes.models import Recipe
 from users.models import Follow
 from foodgram_backend import pagination
+from foodgram_backend.routers import ReplicaReadMixin
 
 User = get_user_model()
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     """Вьюсет пользователей."""
 
     queryset = User.objects.all()
     permission_classes = (IsAuthenticatedOrReadOnly,)
     pagination_class = pagination.CustomPagination
 
+    def get_queryset(self):
+        return super().get_queryset().with_is_subscribed(
+            self.request.user
+        ).order_by('id')
+
     def get_permissions(self):
         if self.action == 'create':
             self.permission_classes = (AllowAny,)
@@ -105,26 +116,14 @@ class UserViewSet(viewsets.ModelViewSet):
     )
     def avatar(self, request):
         """Аватар."""
-        user = request.user
         if request.method == 'PUT':
-            if 'avatar' not in request.data:
-                return Response(status=status.HTTP_400_BAD_REQUEST)
-            serializer = AvatarSerializer(
-                user, data=request.data, partial=True
-            )
-            serializer.is_valid(raise_exception=True)
-            serializer.save()
-            avatar_url = serializer.data.get('avatar')
-            full_avatar_url = f'{avatar_url}'
-            response_data = {'avatar': full_avatar_url}
-            return Response(response_data, status=status.HTTP_200_OK)
-        if request.method == 'DELETE':
-            if not user.avatar:
+            data = put_avatar(request.user, request.data)
+            if data is None:
                 return Response(status=status.HTTP_400_BAD_REQUEST)
-            user.avatar.delete(save=True)
-            user.avatar = None
-            user.save()
-            return Response(status=status.HTTP_204_NO_CONTENT)
+            return Response(data, status=status.HTTP_200_OK)
+        if not delete_avatar(request.user):
+            return Response(status=status.HTTP_400_BAD_REQUEST)
+        return Response(status=status.HTTP_204_NO_CONTENT)
 
     @action(
         detail=True, methods=['post', 'delete'],
@@ -144,26 +143,59 @@ class UserViewSet(viewsets.ModelViewSet):
             return Response(serializer.data, status=status.HTTP_201_CREATED)
 
         if request.method == 'DELETE':
-            try:
-                subscription = Follow.objects.get(
-                    user=user, following=following
-                )
-            except Exception:
+            deleted, _ = Follow.objects.filter(
+                user=user, following=following
+            ).delete()
+            if not deleted:
                 return Response(status=status.HTTP_400_BAD_REQUEST)
-            subscription.delete()
             return Response(status=status.HTTP_204_NO_CONTENT)
 
     @action(detail=False, permission_classes=[IsAuthenticated])
     def subscriptions(self, request):
         user = request.user
-        queryset = User.objects.filter(following__user=user)
+        queryset = User.objects.filter(following__user=user).annotate(
+            is_subscribed=Value(True, output_field=BooleanField())
+        ).order_by('id')
         pages = self.paginate_queryset(queryset)
+        limit = request.query_params.get('recipes_limit', '')
+        recipes = defaultdict(list)
+        for recipe in Recipe.objects.latest_by_author(
+            [author.pk for author in pages],
+            int(limit) if limit.isdigit() else None
+        ):
+            recipes[recipe.author_id].append(recipe)
+        for author in pages:
+            author.recent_recipes = recipes[author.pk]
         serializer = SubscribeSerializer(pages,
                                          many=True,
                                          context={'request': request})
         return self.get_paginated_response(serializer.data)
 
 
+def put_avatar(user, data):
+    """Сохранить аватар из base64. None, если аватар не передан."""
+    if 'avatar' not in data:
+        return None
+    serializer = AvatarSerializer(user, data=data, partial=True)
+    serializer.is_valid(raise_exception=True)
+    serializer.save()
+    return {
+        'avatar': f'{serializer.data.get("avatar")}',
+        'avatar_status': user.avatar_status,
+    }
+
+
+def delete_avatar(user):
+    """Удалить аватар и миниатюру. False, если аватара нет."""
+    if not user.avatar:
+        return False
+    user.avatar_thumbnail.delete(save=False)
+    user.avatar.delete(save=True)
+    user.avatar = None
+    user.save()
+    return True
+
+
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def get_jwt_token(request):
@@ -182,7 +214,9 @@ def user_logout(request):
     """FBV удаления токена(logout)."""
     if request.method == 'POST':
         try:
-            request.user.auth_token.delete()
+            token = request.user.auth_token
+            token_cache.invalidate(token.key)
+            token.delete()
             return Response(
                 {'message': 'Successfully logged out.'},
                 status=status.HTTP_204_NO_CONTENT